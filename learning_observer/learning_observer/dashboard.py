@@ -64,6 +64,35 @@ pmss.register_field(
     default=False
 )
 
+pmss.register_field(
+    name='websocket_compression',
+    type=pmss.pmsstypes.TYPES.boolean,
+    description=(
+        'Allow `permessage-deflate` on the dashboard websocket. aiohttp '
+        'enables it by default; set this to false to opt out, e.g. when '
+        'CPU matters more than bandwidth. Used within the '
+        '`dashboard_settings` namespace.'
+    ),
+    default=True
+)
+
+
+# Batched dashboard updates carry full student texts and annotations,
+# so encoding them is a noticeable part of each send. Use `orjson` when
+# it is installed. Clients parse text frames, so we still send a `str`.
+try:
+    import orjson
+
+    def _dumps_updates(obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            # orjson rejects values the stdlib accepts, such as ints wider
+            # than 64 bits; fall back rather than drop the whole batch.
+            return json.dumps(obj)
+except ImportError:
+    _dumps_updates = json.dumps
+
 
 def timelist_to_seconds(timelist):
     '''
@@ -843,7 +872,10 @@ async def websocket_dashboard_handler(request):
 
     _log_protocol_event('connection_opened')
 
-    ws = aiohttp.web.WebSocketResponse(receive_timeout=0.3)
+    # Updates go out in batches (see `_queue_update`), so each compressed
+    # frame amortizes the deflate overhead across many students.
+    websocket_compression = learning_observer.settings.pmss_settings.websocket_compression(types=['dashboard_settings'], attributes={'domain': user_domain})
+    ws = aiohttp.web.WebSocketResponse(receive_timeout=0.3, compress=websocket_compression)
     await ws.prepare(request)
     client_query = None
     previous_client_query = None
@@ -865,7 +897,7 @@ async def websocket_dashboard_handler(request):
             async with pending_updates_lock:
                 if pending_updates:
                     try:
-                        await ws.send_json(pending_updates)
+                        await ws.send_json(pending_updates, dumps=_dumps_updates)
                         pending_updates.clear()
                     except aiohttp.web_ws.WebSocketError:
                         break
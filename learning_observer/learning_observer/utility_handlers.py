@@ -2,6 +2,7 @@
 Helpful extra handlers
 '''
 
+import functools
 import os
 import os.path
 
@@ -15,31 +16,57 @@ import pathvalidate
 from learning_observer.log_event import debug_log
 
 
+# The handler factories below bind their configuration with
+# `functools.partial` around module-level coroutines, rather than
+# returning a fresh closure per route. `aiohttp` sees through
+# `partial`, so these are registered as native async handlers (the
+# old synchronous closures were wrapped in a deprecated shim on every
+# request), and configuration arrives as plain local arguments.
+
+async def _static_file(filename, request):
+    debug_log(request.headers)
+    return aiohttp.web.FileResponse(filename)
+
+
 def static_file_handler(filename):
     '''
     Serve a single static file
     '''
-    async def handler(request):
-        debug_log(request.headers)
-        return aiohttp.web.FileResponse(filename)
-    return handler
+    return functools.partial(_static_file, filename)
+
+
+async def _json_response(data, request):
+    return aiohttp.web.json_response(data)
 
 
 def json_response_handler(data):
     '''Serve data (dict-like) as a json response
     '''
-    async def handler(request):
-        return aiohttp.web.json_response(data)
-    return handler
+    return functools.partial(_json_response, data)
+
+
+async def _redirect(new_path, request):
+    raise aiohttp.web.HTTPFound(location=new_path)
 
 
 def redirect(new_path):
     '''
     Static, fixed redirect to a new location
     '''
-    async def handler(request):
-        raise aiohttp.web.HTTPFound(location=new_path)
-    return handler
+    return functools.partial(_redirect, new_path)
+
+
+async def _static_directory(basepath, request):
+    # Extract the filename from the request
+    filename = request.match_info['filename']
+    # Raise an exception if we get anything nasty
+    pathvalidate.validate_filename(filename)
+    # Check that the file exists
+    full_pathname = os.path.join(basepath, filename)
+    if not os.path.exists(full_pathname):
+        raise aiohttp.web.HTTPNotFound()
+    # And serve pack the file
+    return aiohttp.web.FileResponse(full_pathname)
 
 
 def static_directory_handler(basepath):
@@ -53,29 +80,15 @@ def static_directory_handler(basepath):
     filenames. Before adding fancy, I'll want test cases of
     aggressive user input.
     '''
+    return functools.partial(_static_directory, basepath)
+
 
-    def handler(request):
-        '''
-        We're in a closure, since we want to configure the directory
-        when we set up the path.
-        '''
-        # Extract the filename from the request
-        filename = request.match_info['filename']
-        # Raise an exception if we get anything nasty
-        pathvalidate.validate_filename(filename)
-        # Check that the file exists
-        full_pathname = os.path.join(basepath, filename)
-        if not os.path.exists(full_pathname):
-            raise aiohttp.web.HTTPNotFound()
-        # And serve pack the file
-        return aiohttp.web.FileResponse(full_pathname)
-    return handler
+async def _ajax(handler_func, request):
+    return aiohttp.web.json_response(handler_func())
 
 
 def ajax_handler_wrapper(handler_func):
     '''
     Wrap a function which returns a JSON object to handle requests
     '''
-    def handler(request):
-        return aiohttp.web.json_response(handler_func())
-    return handler
+    return functools.partial(_ajax, handler_func)
@@ -25,6 +25,22 @@ import learning_observer.settings
 gpt_responder = None
 SYSTEM_PROMPT_DEFAULT = 'You are a helper agent, please help fulfill user requests.'
 LLM_SEMAPHOR = {}
+_session = None
+
+
+def _client_session():
+    '''Return the HTTP session shared by all chat completions, so
+    each request reuses pooled connections instead of opening a new
+    session (and TLS handshake) per student.
+
+    Modules have no shutdown hook, so, like the session in
+    `language_tool`, this one is intentionally left open until the
+    process exits.
+    '''
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession()
+    return _session
 
 
 class GPTAPI:
@@ -74,15 +90,14 @@ class OpenAIGPT(GPTAPI):
             {'role': 'user', 'content': prompt}
         ]
         content = {'model': self.model, 'messages': messages}
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=content) as resp:
-                json_resp = await resp.json()
-                if resp.status == 200:
-                    return json_resp['choices'][0]['message']['content']
-                error = 'Error occured while making OpenAI request'
-                if 'error' in json_resp:
-                    error += f"\n{json_resp['error']['message']}"
-                raise GPTRequestErorr(error)
+        async with _client_session().post(url, headers=headers, json=content) as resp:
+            json_resp = await resp.json()
+            if resp.status == 200:
+                return json_resp['choices'][0]['message']['content']
+            error = 'Error occured while making OpenAI request'
+            if 'error' in json_resp:
+                error += f"\n{json_resp['error']['message']}"
+            raise GPTRequestErorr(error)
 
 
 class OllamaGPT(GPTAPI):
@@ -127,15 +142,14 @@ class OllamaGPT(GPTAPI):
         ]
         content = {'model': self.model, 'messages': messages, 'stream': False}
         async with LLM_SEMAPHOR['ollama']:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=content) as resp:
-                    json_resp = await resp.json(content_type=None)
-                    if resp.status == 200:
-                        return json_resp['message']['content']
-                    error = 'Error occured while making Ollama request'
-                    if 'error' in json_resp:
-                        error += f"\n{json_resp['error']['message']}"
-                    raise GPTRequestErorr(error)
+            async with _client_session().post(url, json=content) as resp:
+                json_resp = await resp.json(content_type=None)
+                if resp.status == 200:
+                    return json_resp['message']['content']
+                error = 'Error occured while making Ollama request'
+                if 'error' in json_resp:
+                    error += f"\n{json_resp['error']['message']}"
+                raise GPTRequestErorr(error)
 
 
 class StubGPT(GPTAPI):
@@ -8,14 +8,15 @@ if (!window.dash_clientside) {
 
 pdfjsLib.GlobalWorkerOptions.workerSrc = '/static/3rd_party/pdf.worker.min.js';
 
-function fetchSelectedItemsFromOptions (value, options, type) {
-  return options.reduce(function (filtered, option) {
-    if (value?.[option.id]?.[type]?.value) {
-      const selected = { ...option, ...value[option.id] };
-      filtered.push(selected);
-    }
-    return filtered;
-  }, []);
+/**
+ * Selected metrics from the WOSettings `value`, without needing the
+ * component's `options`. Every metric option has an entry in the
+ * default value, so the key order already matches the options order.
+ */
+function fetchBulkSelectedMetrics (value) {
+  return Object.entries(value ?? {})
+    .filter(([id, settings]) => settings?.metric?.value)
+    .map(([id, settings]) => ({ id, ...settings }));
 }
 
 function createPasteBadge (children, color = 'secondary', className = 'me-1') {
@@ -136,7 +137,7 @@ function simpleHash (str) {
   return hash.toString(16);
 }
 
-const createStudentCard = function (s, promptHash, width, height, showName, selectedMetrics) {
+const createStudentCard = function (s, promptHash, selectedMetrics) {
   const selectedDocument = s.doc_id || Object.keys(s.documents || {})[0] || '';
   const documentTitle = s?.availableDocuments?.[selectedDocument]?.title ?? selectedDocument ?? '';
   const student = s.documents?.[selectedDocument] ?? {};
@@ -184,7 +185,6 @@ const createStudentCard = function (s, promptHash, width, height, showName, sele
   const studentTile = createDashComponent(
     LO_DASH_REACT_COMPONENTS, 'WOStudentTextTile',
     {
-      showName,
       profile: student?.profile || {},
       selectedDocument,
       documentTitle,
@@ -192,12 +192,12 @@ const createStudentCard = function (s, promptHash, width, height, showName, sele
       id: { type: 'WOAIAssistStudentTileText', index: userId },
       currentOptionHash: promptHash,
       currentStudentHash: student.option_hash_gpt_bulk,
-      style: { height: `${height}px` },
+      className: 'wo-bulk-student-tile-text',
       additionalButtons: createDashComponent(
         DASH_BOOTSTRAP_COMPONENTS, 'Button',
         {
-          id: { type: 'WOAIAssistStudentTileExpand', index: userId },
-          children: createDashComponent(DASH_HTML_COMPONENTS, 'I', { className: 'fas fa-expand' }),
+          className: 'wo-bulk-student-expand',
+          children: getBulkIcons().expand,
           color: 'transparent'
         }
       )
@@ -206,7 +206,7 @@ const createStudentCard = function (s, promptHash, width, height, showName, sele
   const tileWrapper = createDashComponent(
     DASH_HTML_COMPONENTS, 'Div',
     {
-      className: 'position-relative mb-2',
+      className: 'position-relative mb-2 wo-bulk-student-tile',
       children: [
         studentTile,
         createDashComponent(
@@ -215,12 +215,22 @@ const createStudentCard = function (s, promptHash, width, height, showName, sele
         ),
       ],
       id: { type: 'WOAIAssistStudentTile', index: userId },
-      style: { width: `${(100 - width) / width}%` }
+      'data-student-id': userId
     }
   );
   return tileWrapper;
 };
 
+// A single delegated listener handles every tile's expand button, so the
+// grid does not need a pattern-matched n_clicks input per student.
+document.addEventListener('click', function (event) {
+  const button = event.target.closest?.('#bulk-essay-analysis-essay-grid .wo-bulk-student-expand');
+  if (!button) { return; }
+  const tile = button.closest('[data-student-id]');
+  if (!tile) { return; }
+  window.dash_clientside.set_props('bulk-essay-analysis-expanded-student-id', { data: tile.dataset.studentId });
+}, true);
+
 const checkForBulkResponse = function (s, promptHash, options) {
   if (!('documents' in s)) { return false; }
   const selectedDocument = s.doc_id || Object.keys(s.documents || {})[0] || '';
@@ -282,6 +292,62 @@ const fileTextExtractors = {
   docx: extractDOCX
 };
 
+// Latest student grid inputs, and whether a render is already waiting
+// for the next animation frame. Updates that arrive while one is waiting
+// only replace the inputs, so a burst (e.g. many websocket messages
+// arriving together) renders once per frame and never starves.
+let bulkGridPendingArgs;
+let bulkGridRenderScheduled = false;
+
+// Serialized copy of the last students object we published, used to
+// drop websocket updates that didn't change anything.
+let bulkLastPublishedStudents;
+
+// Pattern id type shared by the tag buttons; `role` tells insert, edit
+// and delete apart. Must match `tag` in dashboard/layout.py.
+const BULK_TAG_ID_TYPE = 'bulk-essay-analysis-tags-tag';
+
+// Last (query, loading, tag version) key the query controls were
+// computed for.
+let bulkQueryControlsKey;
+
+// History list items already built by `update_history_list`. The history
+// only ever grows by appending, so each submit builds just the new item.
+let bulkHistoryItems = [];
+
+// Icon components reused across every tile and tag button. Built on
+// first use, since `createDashComponent` comes from the text highlighter
+// assets, which load after this file.
+let bulkIcons;
+function getBulkIcons () {
+  if (!bulkIcons) {
+    const icon = (className) => createDashComponent(DASH_HTML_COMPONENTS, 'I', { className });
+    bulkIcons = {
+      expand: icon('fas fa-expand'),
+      edit: icon('fas fa-edit'),
+      trash: icon('fas fa-trash')
+    };
+  }
+  return bulkIcons;
+}
+
+// ── Default prompts ───────────────────────────────────────────────────
+const BULK_SYSTEM_PROMPT = [
+  'You are a helpful assistant for grade school teachers. Your task is to analyze ',
+  'student writing and provide clear, constructive, and age-appropriate feedback. ',
+  'Focus on key writing traits such as clarity, creativity, grammar, and organization. ',
+  'When summarizing, highlight the main ideas and key details. Always maintain a ',
+  'positive and encouraging tone to support student growth.'
+].join('');
+
+const BULK_STARTING_PROMPTS = [
+  'Provide 3 bullet points summarizing this text:\n{student_text}',
+  'List 3 strengths in this student\'s writing. Use bullet points and focus on creativity or clear ideas:\n{student_text}',
+  'Find 2-3 grammar or spelling errors in this text. For each, quote the sentence and suggest a fix:\n{student_text}',
+  'Identify 1) Main theme 2) Best sentence 3) One area to improve. Use numbered responses:\n{student_text}',
+  'Give one specific compliment and one gentle suggestion to improve this story:\n{student_text}'
+];
+
 const AIAssistantLoadingQueries = ['gpt_bulk', 'time_on_task', 'activity', 'paste_metrics', 'copy_cut_metrics'];
 
 // ── Walkthrough step definitions ──────────────────────────────────────
@@ -470,31 +536,49 @@ window.dash_clientside.bulk_essay_feedback = {
     ];
   },
 
-  initWalkthroughFromStorage: function (step, hasSeenWalkthrough) {
+  /**
+   * Step the walkthrough when a navigation button is clicked, then
+   * render whichever step is current. On the initial call the
+   * walkthrough is skipped for teachers who have already seen it;
+   * dismissing it marks it as seen. The seen store is persisted to
+   * localStorage, so it is only written when it changes.
+   */
+  navigateAndRenderWalkthrough: function (nextClicks, backClicks, doneClicks, skipClicks, helpClicks, currentStep, hasSeenWalkthrough) {
+    const namespace = window.dash_clientside.bulk_essay_feedback;
+    const noUpdate = window.dash_clientside.no_update;
     const triggered = window.dash_clientside.callback_context?.triggered_id;
 
     if (!triggered) {
-      if (hasSeenWalkthrough) {
-        return [-1, true];
-      }
-      return [0, false];
+      // The step store starts at 0, which opens the walkthrough
+      const step = hasSeenWalkthrough ? -1 : currentStep;
+      return [hasSeenWalkthrough ? -1 : noUpdate, noUpdate, ...namespace.renderWalkthroughStep(step)];
     }
 
-    if (step === -1) {
-      return [-1, true];
-    }
+    const nextStep = namespace.navigateWalkthrough(nextClicks, backClicks, doneClicks, skipClicks, helpClicks, currentStep);
+    const step = nextStep === noUpdate ? currentStep : nextStep;
+    const seen = step === -1 && !hasSeenWalkthrough ? true : noUpdate;
+    return [nextStep, seen, ...namespace.renderWalkthroughStep(step)];
+  },
+
+  // ── Prompt callbacks ─────────────────────────────────────────────────
 
-    return [step, hasSeenWalkthrough];
+  initPrompts: function (pathname, query, stagedSystemPrompt, appliedSystemPrompt) {
+    const noUpdate = window.dash_clientside.no_update;
+    return [
+      query ? noUpdate : BULK_STARTING_PROMPTS[Math.floor(Math.random() * BULK_STARTING_PROMPTS.length)],
+      stagedSystemPrompt ? noUpdate : BULK_SYSTEM_PROMPT,
+      appliedSystemPrompt ? noUpdate : BULK_SYSTEM_PROMPT
+    ];
   },
 
   // ── Settings modal callbacks ─────────────────────────────────────────
 
-  toggleSettingsModal: function (clicks, isOpen) {
+  openSettingsModal: function (clicks) {
     if (!clicks) { return window.dash_clientside.no_update; }
-    return !isOpen;
+    return true;
   },
 
-  applySettingsAndCloseModal: function (clicks, stagedSystemPrompt, docKwargs) {
+  applySettingsAndCloseModal: function (clicks, stagedSystemPrompt, docKwargs, appliedDocKwargs) {
     if (!clicks) {
       return [
         window.dash_clientside.no_update,
@@ -502,7 +586,14 @@ window.dash_clientside.bulk_essay_feedback = {
         window.dash_clientside.no_update
       ];
     }
-    return [stagedSystemPrompt, docKwargs, false];
+    // Changing the document source triggers a new websocket request,
+    // so skip the write when the teacher re-applies the same source.
+    const docSourceChanged = JSON.stringify(docKwargs) !== JSON.stringify(appliedDocKwargs);
+    return [
+      stagedSystemPrompt || BULK_SYSTEM_PROMPT,
+      docSourceChanged ? docKwargs : window.dash_clientside.no_update,
+      false
+    ];
   },
 
   // ── Expanded student modal ───────────────────────────────────────────
@@ -513,26 +604,10 @@ window.dash_clientside.bulk_essay_feedback = {
    *
    * Returns [selectedStudentId, isModalOpen, showIdentity].
    */
-  expandCurrentStudent: function (clicks, ids, isModalOpen, currentStudentId, globalShowName) {
-    const triggeredItem = window.dash_clientside.callback_context?.triggered_id ?? null;
-    if (!triggeredItem) { return window.dash_clientside.no_update; }
-
-    // Only act on actual expand button clicks
-    if (triggeredItem?.type !== 'WOAIAssistStudentTileExpand') {
-      return window.dash_clientside.no_update;
-    }
-
-    // Make sure something was actually clicked (not just initial callback fire)
-    const hasActualClick = clicks && clicks.some(c => c !== undefined && c !== null && c > 0);
-    if (!hasActualClick) { return window.dash_clientside.no_update; }
-
-    const id = triggeredItem?.index;
-    const index = ids.findIndex(item => item.index === id);
-    if (index === -1) { return window.dash_clientside.no_update; }
-
+  expandCurrentStudent: function (studentId, globalShowName) {
+    if (!studentId) { return window.dash_clientside.no_update; }
     const showIdentity = globalShowName !== undefined ? globalShowName : true;
-
-    return [id, true, showIdentity];
+    return [true, showIdentity];
   },
 
   /**
@@ -542,13 +617,13 @@ window.dash_clientside.bulk_essay_feedback = {
    *
    * Returns [studentName, docTitle, childContent].
    */
-  renderExpandedStudent: async function (wsStorageData, selectedStudentId, isModalOpen, history, value, options) {
+  renderExpandedStudent: function (students, selectedStudentId, isModalOpen, promptHash, value) {
     // Don't do anything if the modal isn't open
     if (!isModalOpen) {
       return window.dash_clientside.no_update;
     }
 
-    if (!selectedStudentId || !wsStorageData?.students) {
+    if (!selectedStudentId || !students) {
       return [
         '',
         '',
@@ -559,7 +634,7 @@ window.dash_clientside.bulk_essay_feedback = {
       ];
     }
 
-    const student = wsStorageData.students[selectedStudentId];
+    const student = students[selectedStudentId];
     if (!student) {
       return [
         'Student',
@@ -591,11 +666,7 @@ window.dash_clientside.bulk_essay_feedback = {
       .filter(Boolean)
       .join(' ') || 'Student';
 
-    const selectedMetrics = fetchSelectedItemsFromOptions(value, options, 'metric');
-
-    // Compute prompt hash for feedback status
-    const currPrompt = history.length > 0 ? history[history.length - 1] : '';
-    const promptHash = await hashObject({ prompt: currPrompt });
+    const selectedMetrics = fetchBulkSelectedMetrics(value);
 
     // Build student text
     const studentText = createDashComponent(
@@ -673,6 +744,22 @@ window.dash_clientside.bulk_essay_feedback = {
 
   // ── Core dashboard callbacks ─────────────────────────────────────────
 
+  /**
+   * Publish the students from the websocket store, but only when they
+   * changed. The server re-sends unchanged results (e.g. on reruns),
+   * and each publish re-renders the grid, loading bar and expanded
+   * student.
+   */
+  publishStudents: function (wsStorageData) {
+    const students = wsStorageData?.students;
+    const serialized = JSON.stringify(students ?? null);
+    if (serialized === bulkLastPublishedStudents) {
+      return window.dash_clientside.no_update;
+    }
+    bulkLastPublishedStudents = serialized;
+    return students ?? null;
+  },
+
   send_to_loconnection: async function (state, hash, clicks, docKwargs, query, appliedSystemPrompt, tags) {
     if (state === undefined) {
       return window.dash_clientside.no_update;
@@ -691,7 +778,7 @@ window.dash_clientside.bulk_essay_feedback = {
       const trig = window.dash_clientside.callback_context.triggered[0];
       if (trig.prop_id.includes('bulk-essay-analysis-submit-btn')) {
         decoded.gpt_prompt = query;
-        decoded.system_prompt = appliedSystemPrompt;
+        decoded.system_prompt = appliedSystemPrompt || BULK_SYSTEM_PROMPT;
         decoded.tags = tags;
       }
 
@@ -717,30 +804,42 @@ window.dash_clientside.bulk_essay_feedback = {
     return window.dash_clientside.no_update;
   },
 
+  computePromptHash: async function (history) {
+    const currPrompt = history.length > 0 ? history[history.length - 1] : '';
+    return await hashObject({ prompt: currPrompt });
+  },
+
   update_history_list: function (history) {
-    const items = history.map((x) => {
+    // A shorter history means the store was reset (e.g. page reload)
+    if (history.length < bulkHistoryItems.length) {
+      bulkHistoryItems = [];
+    }
+    const added = history.slice(bulkHistoryItems.length).map((x) => {
       return createDashComponent(DASH_HTML_COMPONENTS, 'Li', { children: x });
     });
-    return createDashComponent(DASH_HTML_COMPONENTS, 'Ol', { children: items });
+    bulkHistoryItems = bulkHistoryItems.concat(added);
+    return createDashComponent(DASH_HTML_COMPONENTS, 'Ol', { children: bulkHistoryItems });
   },
 
-  updateStudentGridOutput: async function (wsStorageData, history, width, height, showName, value, options) {
-    if (!wsStorageData?.students) {
-      return buildBulkEmptyState();
+  updateStudentGridOutput: async function (students, promptHash, value) {
+    bulkGridPendingArgs = [students, promptHash, value];
+    if (bulkGridRenderScheduled) {
+      return window.dash_clientside.no_update;
     }
+    bulkGridRenderScheduled = true;
+    await new Promise(resolve => window.requestAnimationFrame(resolve));
+    bulkGridRenderScheduled = false;
+    [students, promptHash, value] = bulkGridPendingArgs;
 
-    const students = wsStorageData.students;
-    if (Object.keys(students).length === 0) {
+    if (!students || Object.keys(students).length === 0) {
       return buildBulkEmptyState();
     }
 
-    const currPrompt = history.length > 0 ? history[history.length - 1] : '';
-    const promptHash = await hashObject({ prompt: currPrompt });
-    const selectedMetrics = fetchSelectedItemsFromOptions(value, options, 'metric');
+    const selectedMetrics = fetchBulkSelectedMetrics(value);
 
     let output = [];
     for (const student in students) {
-      const card = createStudentCard(students[student], promptHash, width, height, showName, selectedMetrics);
+      const card = createStudentCard(students[student], promptHash, selectedMetrics);
       if (card) {
         output = output.concat(card);
       }
@@ -776,6 +875,27 @@ window.dash_clientside.bulk_essay_feedback = {
     return window.dash_clientside.no_update;
   },
 
+  /**
+   * Submit button state and the tag word bank share the tag store, so
+   * we handle both here. The word bank is only rebuilt when the tags
+   * change, not on every keystroke in the query.
+   */
+  updateQueryControls: function (query, loading, tagVersion, store) {
+    const namespace = window.dash_clientside.bulk_essay_feedback;
+    const triggered = (window.dash_clientside.callback_context?.triggered ?? []).map(t => t.prop_id);
+    const initial = triggered.length === 0 || triggered.includes('.');
+    // The layout (and the version store with it) is rebuilt on page load
+    if (initial) { bulkQueryControlsKey = undefined; }
+    const tagsChanged = initial || triggered.includes('bulk-essay-analysis-tags-version-store.data');
+    const tagButtons = tagsChanged ? namespace.update_tag_buttons(store) : window.dash_clientside.no_update;
+    const key = `${query}\x1f${loading ? 1 : 0}\x1f${tagVersion}`;
+    if (key === bulkQueryControlsKey) {
+      return [window.dash_clientside.no_update, window.dash_clientside.no_update, tagButtons];
+    }
+    bulkQueryControlsKey = key;
+    return [...namespace.disableQuerySubmitButton(query, loading, store), tagButtons];
+  },
+
   disableQuerySubmitButton: function (query, loading, store) {
     if (query.length === 0) {
       return [true, 'Please create a request before submitting.'];
@@ -823,6 +943,7 @@ window.dash_clientside.bulk_essay_feedback = {
   },
 
   update_tag_buttons: function (tagStore) {
+    const icons = getBulkIcons();
     const tagLabels = Object.keys(tagStore);
     const tags = tagLabels.map((val) => {
       const isStudentText = val === 'student_text';
@@ -830,7 +951,7 @@ window.dash_clientside.bulk_essay_feedback = {
         DASH_BOOTSTRAP_COMPONENTS, 'Button',
         {
           children: val,
-          id: { type: 'bulk-essay-analysis-tags-tag', index: val },
+          id: { type: BULK_TAG_ID_TYPE, role: 'insert', index: val },
           n_clicks: 0,
           color: isStudentText ? 'warning' : 'info'
         }
@@ -838,8 +959,8 @@ window.dash_clientside.bulk_essay_feedback = {
       const editButton = createDashComponent(
         DASH_BOOTSTRAP_COMPONENTS, 'Button',
         {
-          children: createDashComponent(DASH_HTML_COMPONENTS, 'I', { className: 'fas fa-edit' }),
-          id: { type: 'bulk-essay-analysis-tags-tag-edit', index: val },
+          children: icons.edit,
+          id: { type: BULK_TAG_ID_TYPE, role: 'edit', index: val },
           n_clicks: 0,
           color: 'info'
         }
@@ -850,11 +971,11 @@ window.dash_clientside.bulk_essay_feedback = {
           children: createDashComponent(
             DASH_BOOTSTRAP_COMPONENTS, 'Button',
             {
-              children: createDashComponent(DASH_HTML_COMPONENTS, 'I', { className: 'fas fa-trash' }),
+              children: icons.trash,
               color: 'info'
             }
           ),
-          id: { type: 'bulk-essay-analysis-tags-tag-delete', index: val },
+          id: { type: BULK_TAG_ID_TYPE, role: 'delete', index: val },
           message: `Are you sure you want to delete the \`${val}\` placeholder?`
         }
       );
@@ -871,55 +992,73 @@ window.dash_clientside.bulk_essay_feedback = {
     return tags;
   },
 
-  savePlaceholder: function (clicks, label, text, replacementId, tagStore) {
+  savePlaceholder: function (clicks, label, text, replacementId, actions) {
     if (clicks > 0) {
-      const newStore = { ...tagStore };
-      if (!!replacementId && replacementId !== label) {
-        delete newStore[replacementId];
-      }
-      newStore[label] = text;
-      return [newStore, false];
+      return [[...(actions ?? []), { op: 'add', tag: label, text, replaces: replacementId }], false];
     }
     return window.dash_clientside.no_update;
   },
 
-  removePlaceholder: function (clicks, tagStore, ids) {
+  removePlaceholder: function (clicks, actions, ids) {
     const triggeredItem = window.dash_clientside.callback_context?.triggered_id ?? null;
     if (!triggeredItem) { return window.dash_clientside.no_update; }
     const id = triggeredItem.index;
     const index = ids.findIndex(item => item.index === id);
     if (clicks[index]) {
-      const newStore = { ...tagStore };
-      delete newStore[id];
-      return newStore;
+      return [...(actions ?? []), { op: 'del', tag: id }];
     }
     return window.dash_clientside.no_update;
   },
 
+  /**
+   * Drain the queued placeholder actions into a single tag store write,
+   * bump the tag version and clear the queue.
+   */
+  applyTagActions: function (actions, tagStore, version) {
+    if (!actions?.length) {
+      return [
+        window.dash_clientside.no_update,
+        window.dash_clientside.no_update,
+        window.dash_clientside.no_update
+      ];
+    }
+    const newStore = { ...tagStore };
+    actions.forEach(action => {
+      if (action.op === 'add') {
+        if (!!action.replaces && action.replaces !== action.tag) {
+          delete newStore[action.replaces];
+        }
+        newStore[action.tag] = action.text;
+      } else if (action.op === 'del') {
+        delete newStore[action.tag];
+      }
+    });
+    return [newStore, (version ?? 0) + 1, []];
+  },
+
   updateAlertWithError: function (error) {
+    // The error dump output is only registered in dev mode
+    const withDump = window.dash_clientside.callback_context.outputs_list.length > 2;
     if (Object.keys(error).length === 0) {
-      return ['', false, ''];
+      return withDump ? ['', false, ''] : ['', false];
     }
     const text = 'Oops! Something went wrong ' +
                  "on our end. We've noted the " +
                  'issue. Please try again later, or consider ' +
                  'exploring a different dashboard for now. ' +
                  'Thanks for your patience!';
-    return [text, true, error];
+    return withDump ? [text, true, error] : [text, true];
   },
 
-  updateLoadingInformation: async function (wsStorageData, history) {
+  updateLoadingInformation: function (students, promptHash) {
     const noLoading = [false, 0, ''];
-    if (!wsStorageData?.students) {
+    if (!students) {
       return noLoading;
     }
-    const students = wsStorageData.students;
     const totalStudents = Object.keys(students).length;
     if (totalStudents === 0) {
       return noLoading;
     }
-    const currentPrompt = history.length > 0 ? history[history.length - 1] : '';
-    const promptHash = await hashObject({ prompt: currentPrompt });
     const returnedResponses = Object.values(students).filter(student => checkForBulkResponse(student, promptHash, AIAssistantLoadingQueries)).length;
     if (totalStudents === returnedResponses) { return noLoading; }
     const loadingProgress = returnedResponses / totalStudents + 0.1;
@@ -927,16 +1066,15 @@ window.dash_clientside.bulk_essay_feedback = {
     return [true, loadingProgress, outputText];
   },
 
-  adjustTileSize: function (width, height, studentIds) {
-    const total = studentIds.length;
-    return [
-      Array(total).fill({ width: `${(100 - width) / width}%` }),
-      Array(total).fill({ height: `${height}px` })
-    ];
+  adjustTileSize: function (width, height) {
+    return {
+      '--wo-bulk-tile-width': `${(100 - width) / width}%`,
+      '--wo-bulk-tile-height': `${height}px`
+    };
   },
 
-  showHideHeader: function (show, ids) {
-    const total = ids.length;
-    return Array(total).fill(show ? 'd-none' : '');
+  showHideHeader: function (show) {
+    const gridClassName = 'd-flex justify-content-between flex-wrap';
+    return show ? gridClassName : `${gridClassName} wo-bulk-hide-headers`;
   }
 };
@@ -5,7 +5,6 @@ student essays with LLMs.
 import dash_bootstrap_components as dbc
 from dash_renderjson import DashRenderjson
 import lo_dash_react_components as lodrc
-import random
 
 from dash import html, dcc, clientside_callback, ClientsideFunction, Output, Input, State, ALL
 
@@ -50,9 +49,9 @@ _applied_doc_src = f'{_settings_prefix}-applied-doc-src'
 _tags = f'{prefix}-tags'
 placeholder_tooltip = f'{_tags}-placeholder-tooltip'
 tag = f'{_tags}-tag'
-_tag_edit = f'{tag}-edit'
-_tag_delete = f'{tag}-delete'
 tag_store = f'{_tags}-tags-store'
+_tag_actions = f'{_tags}-actions-store'
+_tag_version = f'{_tags}-version-store'
 _tag_add = f'{_tags}-add'
 _tag_replacement_id = f'{_tag_add}-replacement-id'
 _tag_add_modal = f'{_tag_add}-modal'
@@ -97,6 +96,7 @@ tag_modal = dbc.Modal([
 # Prompt history DOM ids
 history_body = f'{prefix}-history-body'
 history_store = f'{prefix}-history-store'
+_applied_prompt_hash = f'{prefix}-applied-prompt-hash'
 
 # Loading message/bar DOM ids
 _loading_prefix = f'{prefix}-loading'
@@ -107,6 +107,7 @@ _loading_information = f'{_loading_prefix}-information-text'
 submit = f'{prefix}-submit-btn'
 submit_warning_message = f'{prefix}-submit-warning-msg'
 grid = f'{prefix}-essay-grid'
+_students = f'{prefix}-students'
 
 # ── Expanded student modal DOM IDs ─────────────────────────────────────
 _expanded_student = f'{prefix}-expanded-student'
@@ -235,23 +236,8 @@ walkthrough_modal = dbc.Modal(
 )
 
 # ── Settings Modal ─────────────────────────────────────────────────────
-# Default prompts
-system_prompt = (
-    'You are a helpful assistant for grade school teachers. Your task is to analyze '
-    'student writing and provide clear, constructive, and age-appropriate feedback. '
-    'Focus on key writing traits such as clarity, creativity, grammar, and organization. '
-    'When summarizing, highlight the main ideas and key details. Always maintain a '
-    'positive and encouraging tone to support student growth.'
-)
-
-starting_prompt = [
-    'Provide 3 bullet points summarizing this text:\n{student_text}',
-    'List 3 strengths in this student\'s writing. Use bullet points and focus on creativity or clear ideas:\n{student_text}',
-    'Find 2-3 grammar or spelling errors in this text. For each, quote the sentence and suggest a fix:\n{student_text}',
-    'Identify 1) Main theme 2) Best sentence 3) One area to improve. Use numbered responses:\n{student_text}',
-    'Give one specific compliment and one gentle suggestion to improve this story:\n{student_text}'
-]
-
+# The default system prompt and the starting query prompts live in
+# `assets/scripts.js`; `initPrompts` fills the inputs in on page load.
 settings_modal = dbc.Modal([
     dbc.ModalHeader(dbc.ModalTitle('Dashboard Settings'), close_button=True),
     dbc.ModalBody([
@@ -266,7 +252,7 @@ settings_modal = dbc.Modal([
                 ),
                 dbc.Textarea(
                     id=_system_input_staged,
-                    value=system_prompt,
+                    value='',
                     style={'minHeight': '150px'}
                 ),
             ])
@@ -313,7 +299,7 @@ settings_modal = dbc.Modal([
 # Hidden stores for applied values
 applied_system_prompt_store = dcc.Store(
     id=_applied_system_prompt,
-    data=system_prompt
+    data=None
 )
 applied_doc_src_store = dcc.Store(
     id=_applied_doc_src,
@@ -321,10 +307,12 @@ applied_doc_src_store = dcc.Store(
 )
 
 # Alert Component
+# The raw error dump is only mounted in dev mode; outside of it the
+# alert callback has no output for it either.
 alert_component = dbc.Alert([
     html.Div(id=_alert_text),
-    html.Div(DashRenderjson(id=_alert_error_dump), className='' if DEBUG_FLAG else 'd-none')
-], id=_alert, color='danger', is_open=False)
+] + ([html.Div(DashRenderjson(id=_alert_error_dump))] if DEBUG_FLAG else []),
+    id=_alert, color='danger', is_open=False)
 
 # Loading component
 loading_component = dbc.Collapse([
@@ -353,148 +341,164 @@ input_group = dbc.InputGroup([
 ], class_name='mb-1 align-items-center')
 
 
-def layout():
-    '''
-    Generic layout function to create dashboard
-    '''
-    # History panel
-    history_favorite_panel = dbc.Card([
-        dbc.CardHeader('Prompt History'),
-        dbc.CardBody([], id=history_body),
-        dcc.Store(id=history_store, data=[])
-    ], class_name='h-100')
-
-    # Query creator panel
-    input_panel = dbc.Card([
-        dbc.CardHeader('Prompt Input'),
-        dbc.CardBody([
-            dbc.Label('Query'),
-            dbc.Textarea(
-                id=query_input,
-                value=random.choice(starting_prompt),
-                class_name='h-100',
-                style={'minHeight': '150px'}
-            ),
-            html.Div([
-                html.Span([
-                    'Placeholders',
-                    html.I(className='fas fa-circle-question ms-1', id=placeholder_tooltip)
-                ], className='me-1'),
-                html.Span([], id=_tags),
-                dbc.Button(
-                    [html.I(className='fas fa-add me-1'), 'Add'],
-                    id=_tag_add_open,
-                    class_name='ms-1 mb-1'
-                )
-            ], className='mt-1'),
-            dbc.Tooltip(
-                'Click a placeholder to insert it into your query. Upon submission, '
-                'it will be replaced with the corresponding value.',
-                target=placeholder_tooltip
-            ),
-            tag_modal,
-            dcc.Store(id=tag_store, data={'student_text': ''}),
-        ]),
-        dbc.CardFooter([
-            html.Small(id=submit_warning_message, className='text-secondary'),
+# ── Page layout ────────────────────────────────────────────────────────
+# History panel
+history_favorite_panel = dbc.Card([
+    dbc.CardHeader('Prompt History'),
+    dbc.CardBody([], id=history_body),
+    dcc.Store(id=history_store, data=[]),
+    # Hash of the most recent prompt, used to match up student responses
+    dcc.Store(id=_applied_prompt_hash, data='')
+], class_name='h-100')
+
+# Query creator panel
+input_panel = dbc.Card([
+    dbc.CardHeader('Prompt Input'),
+    dbc.CardBody([
+        dbc.Label('Query'),
+        dbc.Textarea(
+            id=query_input,
+            value='',
+            class_name='h-100',
+            style={'minHeight': '150px'}
+        ),
+        html.Div([
+            html.Span([
+                'Placeholders',
+                html.I(className='fas fa-circle-question ms-1', id=placeholder_tooltip)
+            ], className='me-1'),
+            html.Span([], id=_tags),
             dbc.Button(
-                [html.I(className='fas fa-paper-plane me-1'), 'Submit'],
-                color='primary',
-                id=submit,
-                n_clicks=0,
-                class_name='float-end'
+                [html.I(className='fas fa-add me-1'), 'Add'],
+                id=_tag_add_open,
+                class_name='ms-1 mb-1'
             )
-        ])
+        ], className='mt-1'),
+        dbc.Tooltip(
+            'Click a placeholder to insert it into your query. Upon submission, '
+            'it will be replaced with the corresponding value.',
+            target=placeholder_tooltip
+        ),
+        tag_modal,
+        dcc.Store(id=tag_store, data={'student_text': ''}),
+        dcc.Store(id=_tag_actions, data=[]),
+        dcc.Store(id=_tag_version, data=0),
+    ]),
+    dbc.CardFooter([
+        html.Small(id=submit_warning_message, className='text-secondary'),
+        dbc.Button(
+            [html.I(className='fas fa-paper-plane me-1'), 'Submit'],
+            color='primary',
+            id=submit,
+            n_clicks=0,
+            class_name='float-end'
+        )
     ])
+])
+
+# The page is a static tree; everything dynamic happens in the clientside
+# callbacks below, so we build it once rather than on every page load.
+_page = html.Div(dbc.Container([
+    html.H1('Writing Observer — Classroom AI Feedback Assistant'),
+    # Stores
+    applied_system_prompt_store,
+    applied_doc_src_store,
+    walkthrough_store,
+    walkthrough_seen_store,
+    expanded_student_id_store,
+    expanded_student_show_identity_store,
+    # Students from the websocket store, only updated when they change
+    dcc.Store(id=_students, data=None),
+    # Modals
+    walkthrough_modal,
+    settings_modal,
+    expanded_student_modal,
+    # Toolbar
+    html.Div([
+        html.Div(input_group, className='d-flex me-2'),
+        html.Div(loading_component, className='d-flex')
+    ], className='d-flex sticky-top pb-1 bg-light'),
+    alert_component,
+    # Prompt input + history
+    lodrc.LOPanelLayout(
+        input_panel,
+        panels=[
+            {'children': history_favorite_panel, 'width': '30%', 'id': 'history-favorite'},
+        ],
+        shown=['history-favorite'],
+        id=panel_layout
+    ),
+    html.H3('Student Text', className='mt-1'),
+    html.Div(id=grid, className='d-flex justify-content-between flex-wrap'),
+], fluid=True))
 
-    cont = dbc.Container([
-        html.H1('Writing Observer — Classroom AI Feedback Assistant'),
-        # Stores
-        applied_system_prompt_store,
-        applied_doc_src_store,
-        walkthrough_store,
-        walkthrough_seen_store,
-        expanded_student_id_store,
-        expanded_student_show_identity_store,
-        # Modals
-        walkthrough_modal,
-        settings_modal,
-        expanded_student_modal,
-        # Toolbar
-        html.Div([
-            html.Div(input_group, className='d-flex me-2'),
-            html.Div(loading_component, className='d-flex')
-        ], className='d-flex sticky-top pb-1 bg-light'),
-        alert_component,
-        # Prompt input + history
-        lodrc.LOPanelLayout(
-            input_panel,
-            panels=[
-                {'children': history_favorite_panel, 'width': '30%', 'id': 'history-favorite'},
-            ],
-            shown=['history-favorite'],
-            id=panel_layout
-        ),
-        html.H3('Student Text', className='mt-1'),
-        html.Div(id=grid, className='d-flex justify-content-between flex-wrap'),
-    ], fluid=True)
-    return html.Div(cont)
+
+def layout():
+    '''
+    Generic layout function to create dashboard
+    '''
+    return _page
 
 
 # ══════════════════════════════════════════════════════════════════════
 # Walkthrough callbacks
 # ══════════════════════════════════════════════════════════════════════
 
-# On load or when step changes, sync with localStorage
+# Navigate between walkthrough steps and render the current step. On
+# load this skips the walkthrough if it was already seen, and dismissing
+# it records that in localStorage.
 clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='initWalkthroughFromStorage'),
-    Output(_walkthrough_store, 'data', allow_duplicate=True),
-    Output(_walkthrough_seen_store, 'data'),
-    Input(_walkthrough_store, 'data'),
-    State(_walkthrough_seen_store, 'data'),
-    prevent_initial_call='initial_duplicate',
-)
-
-# Navigate between walkthrough steps
-clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='navigateWalkthrough'),
+    ClientsideFunction(namespace=_namespace, function_name='navigateAndRenderWalkthrough'),
     Output(_walkthrough_store, 'data'),
+    Output(_walkthrough_seen_store, 'data'),
+    Output(_walkthrough_title, 'children'),
+    Output(_walkthrough_body, 'children'),
+    Output(_walkthrough_back, 'disabled'),
+    Output(_walkthrough_next, 'style'),
+    Output(_walkthrough_done, 'style'),
+    Output(_walkthrough_counter, 'children'),
+    Output(_walkthrough_modal, 'is_open'),
     Input(_walkthrough_next, 'n_clicks'),
     Input(_walkthrough_back, 'n_clicks'),
     Input(_walkthrough_done, 'n_clicks'),
     Input(_walkthrough_skip, 'n_clicks'),
     Input(_help_button, 'n_clicks'),
     State(_walkthrough_store, 'data'),
-    prevent_initial_call=True,
+    State(_walkthrough_seen_store, 'data'),
 )
 
-# Render walkthrough step content
+# ══════════════════════════════════════════════════════════════════════
+# Prompt callbacks
+# ══════════════════════════════════════════════════════════════════════
+
+# On load, pick a starting query and fill in the default system prompt
 clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='renderWalkthroughStep'),
-    Output(_walkthrough_title, 'children'),
-    Output(_walkthrough_body, 'children'),
-    Output(_walkthrough_back, 'disabled'),
-    Output(_walkthrough_next, 'style'),
-    Output(_walkthrough_done, 'style'),
-    Output(_walkthrough_counter, 'children'),
-    Output(_walkthrough_modal, 'is_open'),
-    Input(_walkthrough_store, 'data'),
+    ClientsideFunction(namespace=_namespace, function_name='initPrompts'),
+    Output(query_input, 'value', allow_duplicate=True),
+    Output(_system_input_staged, 'value'),
+    Output(_applied_system_prompt, 'data', allow_duplicate=True),
+    Input('_pages_location', 'pathname'),
+    State(query_input, 'value'),
+    State(_system_input_staged, 'value'),
+    State(_applied_system_prompt, 'data'),
+    prevent_initial_call='initial_duplicate',
 )
 
 # ══════════════════════════════════════════════════════════════════════
 # Settings modal callbacks
 # ══════════════════════════════════════════════════════════════════════
 
-# Toggle settings modal open
+# Open settings modal. The backdrop covers the toggle while the modal is
+# open, so closing is left to the modal's own close button.
 clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='toggleSettingsModal'),
+    ClientsideFunction(namespace=_namespace, function_name='openSettingsModal'),
     Output(_settings_modal, 'is_open'),
     Input(_settings_toggle, 'n_clicks'),
-    State(_settings_modal, 'is_open'),
     prevent_initial_call=True
 )
 
-# Apply settings and close modal
+# Apply settings and close modal. The document source is only written
+# when it changed, since a new document source re-sends our request.
 clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='applySettingsAndCloseModal'),
     Output(_applied_system_prompt, 'data'),
@@ -503,6 +507,7 @@ clientside_callback(
     Input(_settings_run, 'n_clicks'),
     State(_system_input_staged, 'value'),
     State(lodrc.LODocumentSourceSelectorAIO.ids.kwargs_store(_settings_doc_src), 'data'),
+    State(_applied_doc_src, 'data'),
     prevent_initial_call=True
 )
 
@@ -523,14 +528,16 @@ clientside_callback(
     State(tag_store, 'data'),
 )
 
-# Enable/disable submit based on query
+# Enable/disable submit based on query and populate the tag word bank
 clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='disableQuerySubmitButton'),
+    ClientsideFunction(namespace=_namespace, function_name='updateQueryControls'),
     Output(submit, 'disabled'),
     Output(submit_warning_message, 'children'),
+    Output(_tags, 'children'),
     Input(query_input, 'value'),
     Input(_loading_collapse, 'is_open'),
-    Input(tag_store, 'data')
+    Input(_tag_version, 'data'),
+    State(tag_store, 'data')
 )
 
 # Add submitted query to history
@@ -549,6 +556,13 @@ clientside_callback(
     Input(history_store, 'data')
 )
 
+# Hash the most recent prompt once for everything that needs it
+clientside_callback(
+    ClientsideFunction(namespace=_namespace, function_name='computePromptHash'),
+    Output(_applied_prompt_hash, 'data'),
+    Input(history_store, 'data')
+)
+
 # Toggle add placeholder modal
 clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='openTagAddModal'),
@@ -557,9 +571,9 @@ clientside_callback(
     Output(_tag_add_label, 'value'),
     Output(_tag_add_text, 'value'),
     Input(_tag_add_open, 'n_clicks'),
-    Input({'type': _tag_edit, 'index': ALL}, 'n_clicks'),
+    Input({'type': tag, 'role': 'edit', 'index': ALL}, 'n_clicks'),
     State(tag_store, 'data'),
-    State({'type': _tag_edit, 'index': ALL}, 'id'),
+    State({'type': tag, 'role': 'edit', 'index': ALL}, 'id'),
 )
 
 # Handle file upload to placeholder text field
@@ -577,28 +591,31 @@ clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='updateAlertWithError'),
     Output(_alert_text, 'children'),
     Output(_alert, 'is_open'),
-    Output(_alert_error_dump, 'data'),
+    *([Output(_alert_error_dump, 'data')] if DEBUG_FLAG else []),
     Input(lodrc.LOConnectionAIO.ids.error_store(_websocket), 'data')
 )
 
+# Publish students from the websocket store when they change
+clientside_callback(
+    ClientsideFunction(namespace=_namespace, function_name='publishStudents'),
+    Output(_students, 'data'),
+    Input(lodrc.LOConnectionAIO.ids.ws_store(_websocket), 'data')
+)
+
 # Update student grid
 clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='updateStudentGridOutput'),
     Output(grid, 'children'),
-    Input(lodrc.LOConnectionAIO.ids.ws_store(_websocket), 'data'),
-    Input(history_store, 'data'),
-    Input(_settings_width, 'value'),
-    Input(_settings_height, 'value'),
-    Input(_settings_hide_header, 'value'),
-    Input(_settings_text_information, 'value'),
-    State(_settings_text_information, 'options')
+    Input(_students, 'data'),
+    Input(_applied_prompt_hash, 'data'),
+    Input(_settings_text_information, 'value')
 )
 
 # Append tag to query input
 clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='add_tag_to_input'),
     Output(query_input, 'value', allow_duplicate=True),
-    Input({'type': tag, 'index': ALL}, 'n_clicks'),
+    Input({'type': tag, 'role': 'insert', 'index': ALL}, 'n_clicks'),
     State(query_input, 'value'),
     State(tag_store, 'data'),
     prevent_initial_call=True
@@ -615,33 +632,39 @@ clientside_callback(
     State(_tag_replacement_id, 'value')
 )
 
-# Populate tag word bank
-clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='update_tag_buttons'),
-    Output(_tags, 'children'),
-    Input(tag_store, 'data')
-)
-
-# Save placeholder to storage
+# Queue a placeholder save
 clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='savePlaceholder'),
-    Output(tag_store, 'data'),
+    Output(_tag_actions, 'data'),
     Output(_tag_add_modal, 'is_open', allow_duplicate=True),
     Input(_tag_add_save, 'n_clicks'),
     State(_tag_add_label, 'value'),
     State(_tag_add_text, 'value'),
     State(_tag_replacement_id, 'value'),
-    State(tag_store, 'data'),
+    State(_tag_actions, 'data'),
     prevent_initial_call=True
 )
 
-# Remove placeholder from storage
+# Queue a placeholder removal
 clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='removePlaceholder'),
-    Output(tag_store, 'data', allow_duplicate=True),
-    Input({'type': _tag_delete, 'index': ALL}, 'submit_n_clicks'),
+    Output(_tag_actions, 'data', allow_duplicate=True),
+    Input({'type': tag, 'role': 'delete', 'index': ALL}, 'submit_n_clicks'),
+    State(_tag_actions, 'data'),
+    State({'type': tag, 'role': 'delete', 'index': ALL}, 'id'),
+    prevent_initial_call=True
+)
+
+# Apply queued placeholder actions to the tag store in one write and
+# bump the version that downstream callbacks listen to
+clientside_callback(
+    ClientsideFunction(namespace=_namespace, function_name='applyTagActions'),
+    Output(tag_store, 'data'),
+    Output(_tag_version, 'data'),
+    Output(_tag_actions, 'data', allow_duplicate=True),
+    Input(_tag_actions, 'data'),
     State(tag_store, 'data'),
-    State({'type': _tag_delete, 'index': ALL}, 'id'),
+    State(_tag_version, 'data'),
     prevent_initial_call=True
 )
 
@@ -651,48 +674,45 @@ clientside_callback(
     Output(_loading_collapse, 'is_open'),
     Output(_loading_progress, 'value'),
     Output(_loading_information, 'children'),
-    Input(lodrc.LOConnectionAIO.ids.ws_store(_websocket), 'data'),
-    Input(history_store, 'data')
+    Input(_students, 'data'),
+    Input(_applied_prompt_hash, 'data')
 )
 
-# Adjust student tile size
+# Adjust student tile size. Tiles read their size from CSS variables
+# set on the grid (see styles.css), so this is a single style update
+# regardless of how many students are shown.
 clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='adjustTileSize'),
-    Output({'type': 'WOAIAssistStudentTile', 'index': ALL}, 'style', allow_duplicate=True),
-    Output({'type': 'WOAIAssistStudentTileText', 'index': ALL}, 'style', allow_duplicate=True),
+    Output(grid, 'style'),
     Input(_settings_width, 'value'),
     Input(_settings_height, 'value'),
-    State({'type': 'WOAIAssistStudentTile', 'index': ALL}, 'id'),
-    prevent_initial_call=True
 )
 
-# Expand a single student into modal
-# ── Expand: record which student was clicked, open modal ──────────────
+# ── Expand: open the modal for the clicked student ────────────────────
+# The student id is written by a delegated click listener on the grid
+# (see assets/scripts.js), so no per-tile inputs are needed here.
 clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='expandCurrentStudent'),
-    Output(_expanded_student_id, 'data'),
     Output(_expanded_student_modal, 'is_open'),
     Output(_expanded_student_show_identity, 'data'),
-    Input({'type': 'WOAIAssistStudentTileExpand', 'index': ALL}, 'n_clicks'),
-    State({'type': 'WOAIAssistStudentTile', 'index': ALL}, 'id'),
-    State(_expanded_student_modal, 'is_open'),
-    State(_expanded_student_id, 'data'),
+    Input(_expanded_student_id, 'data'),
     State(_settings_hide_header, 'value'),
     prevent_initial_call=True
 )
 
 # ── Expand: reactively render content from live websocket data ────────
+# The modal's `is_open` is an Input so the first render waits for
+# `expandCurrentStudent` to open it for the clicked student.
 clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='renderExpandedStudent'),
     Output(_expanded_student_title, 'children'),
     Output(_expanded_student_doc_title, 'children'),
     Output(_expanded_student_child, 'children'),
-    Input(lodrc.LOConnectionAIO.ids.ws_store(_websocket), 'data'),
+    Input(_students, 'data'),
     Input(_expanded_student_id, 'data'),
-    State(_expanded_student_modal, 'is_open'),
-    State(history_store, 'data'),
+    Input(_expanded_student_modal, 'is_open'),
+    State(_applied_prompt_hash, 'data'),
     State(_settings_text_information, 'value'),
-    State(_settings_text_information, 'options'),
 )
 
 # Toggle identity visibility within the expanded modal
@@ -713,10 +733,9 @@ clientside_callback(
     Input(_expanded_student_show_identity, 'data'),
 )
 
-# Show/hide student tile headers
+# Show/hide student tile headers by toggling a class on the grid
 clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='showHideHeader'),
-    Output({'type': 'WOAIAssistStudentTileText', 'index': ALL}, 'showName'),
+    Output(grid, 'className'),
     Input(_settings_hide_header, 'value'),
-    State({'type': 'WOAIAssistStudentTileText', 'index': ALL}, 'id'),
 )
@@ -5,24 +5,21 @@ import learning_observer.settings
 
 import lo_gpt.gpt
 
-template = """[Task]\n{question}\n\n[Essay]\n{text}"""
-rubric_template = """{task}\n\n[Rubric]\n{rubric}"""
+
+@learning_observer.cache.async_memoization()
+async def gpt(gpt_prompt, system_prompt):
+    '''
+    Memoized chat completion. The system prompt is an argument so it
+    is part of the cache key.
+    '''
+    return await lo_gpt.gpt.gpt_responder.chat_completion(gpt_prompt, system_prompt)
 
 
 @learning_observer.communication_protocol.integration.publish_function('wo_bulk_essay_analysis.gpt_essay_prompt')
 async def process_student_essay(text, prompt, system_prompt, tags):
     '''
     This method processes text with a prompt through GPT.
-
-    We use a closure to allow the system to connect to the memoization KVS.
     '''
-    copy_tags = tags.copy()
-
-    @learning_observer.cache.async_memoization()
-    async def gpt(gpt_prompt):
-        completion = await lo_gpt.gpt.gpt_responder.chat_completion(gpt_prompt, system_prompt)
-        return completion
-
     if len(prompt) == 0:
         output = {
             'text': text,
@@ -36,12 +33,11 @@ async def process_student_essay(text, prompt, system_prompt, tags):
             'prompt': prompt
         }
     else:
-        copy_tags['student_text'] = text
-        formatted_prompt = prompt.format(**copy_tags)
+        formatted_prompt = prompt.format_map({**tags, 'student_text': text})
 
         output = {
             'text': text,
-            'feedback': await gpt(formatted_prompt),
+            'feedback': await gpt(formatted_prompt, system_prompt),
             'prompt': prompt
         }
     return output
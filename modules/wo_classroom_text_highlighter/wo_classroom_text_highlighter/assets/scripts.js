@@ -10,6 +10,7 @@ const DASH_HTML_COMPONENTS = 'dash_html_components';
 const DASH_CORE_COMPONENTS = 'dash_core_components';
 const DASH_BOOTSTRAP_COMPONENTS = 'dash_bootstrap_components';
 const LO_DASH_REACT_COMPONENTS = 'lo_dash_react_components';
+const DASH_RENDERJSON = 'dash_renderjson';
 
 function createDashComponent (namespace, type, props) {
   return { namespace, type, props };
@@ -66,31 +67,46 @@ function simpleHash (str) {
   return hash.toString(16);
 }
 
-function formatStudentData (document, selectedHighlights) {
-  const breakpoints = selectedHighlights.reduce((acc, option) => {
-    const offsets = document[option.id]?.offsets || [];
-    if (offsets) {
-      const modifiedOffsets = offsets.map(offset => {
-        return {
-          id: '',
-          tooltip: option.label,
-          start: offset[0],
-          offset: offset[1],
-          style: { backgroundColor: option.highlight.color }
-        };
+let compiledHighlightsKey;
+let compiledHighlights = [];
+
+/**
+ * Reduce the selected highlight options to what each breakpoint needs
+ * (id, tooltip and one shared style object per highlight). The selected
+ * highlights rarely change, so the last result is kept and reused for
+ * every student until they do.
+ */
+function compileHighlights (selectedHighlights) {
+  const key = JSON.stringify(selectedHighlights.map(option => [option.id, option.label, option.highlight.color]));
+  if (key !== compiledHighlightsKey) {
+    compiledHighlightsKey = key;
+    compiledHighlights = selectedHighlights.map(option => ({
+      id: option.id,
+      tooltip: option.label,
+      style: { backgroundColor: option.highlight.color }
+    }));
+  }
+  return compiledHighlights;
+}
+
+function formatStudentData (document, highlights) {
+  const breakpoints = [];
+  for (const highlight of highlights) {
+    const offsets = document[highlight.id]?.offsets || [];
+    for (const offset of offsets) {
+      breakpoints.push({
+        id: '',
+        tooltip: highlight.tooltip,
+        start: offset[0],
+        offset: offset[1],
+        style: highlight.style
       });
-      acc = acc.concat(modifiedOffsets);
     }
-    return acc;
-  }, []);
+  }
   const text = document.text;
   return { text, breakpoints };
 }
 
-function styleStudentTile (width, height) {
-  return { width: `${(100 - width) / width}%`, height: `${height}px` };
-}
-
 function fetchSelectedItemsFromOptions (value, options, type) {
   return options.reduce(function (filtered, option) {
     if (value?.[option.id]?.[type]?.value) {
@@ -153,6 +169,67 @@ function studentHasResponded (student, appliedHash) {
   return true;
 }
 
+// The first websocket update opens a flush window of this many
+// milliseconds; when it closes, the latest students are published to
+// the students store as a single update.
+const STUDENT_FLUSH_MS = 50;
+let studentFlushPending = false;
+let pendingStudents = null;
+
+// Last applied options we hashed (serialized) and their hash, so
+// re-applying the same options skips the digest.
+let lastAppliedHashInput;
+let lastAppliedHash;
+
+// Applied hash last pushed to the tiles. Tiles built after that already
+// get the current hash from `populateOutput`.
+let lastBroadcastHash;
+
+// Keys describing the last legend and loading bar we rendered, so that
+// updates which would render the same thing can be skipped.
+let lastLegendKey;
+let lastLoadingKey;
+
+/**
+ * Whether the running callback is the initial call made when the page
+ * layout is rendered. Output caches must be ignored then, since the
+ * layout starts from its defaults.
+ */
+function isInitialCall () {
+  const triggered = window.dash_clientside.callback_context?.triggered ?? [];
+  return triggered.length === 0 || triggered.every(t => t.prop_id === '.');
+}
+
+// Tiles built by the last `populateOutput`, by student id. The websocket
+// store replaces a document object when it is updated successfully, so
+// an unchanged document reference (with the same display settings)
+// usually means the previously built tile can be reused. Errors are
+// written onto the existing object instead, so the cache also compares
+// the fields that path touches (see `docStatusSignature`).
+let studentTileCache = new Map();
+
+/**
+ * Fields that LOConnectionAIO changes in place on a document when an
+ * error arrives, joined into a cheap string to compare against the
+ * cached tile's.
+ */
+function docStatusSignature (doc) {
+  return `${doc?.option_hash}|${JSON.stringify(doc?.error ?? null)}`;
+}
+
+// Student ids and display settings of the last full render of the
+// output. While both stay the same, changed tiles are patched in place.
+let lastOutputLayoutKey;
+
+// Requests triggered within this many milliseconds of each other (e.g.
+// applying options changes both the doc source and the option hash) are
+// sent to the server once.
+const SEND_DEBOUNCE_MS = 75;
+let sendToken = 0;
+
+// Serialized copy of the error last rendered into the error dump
+let lastErrorDump;
+
 const ClassroomTextHighlightLoadingQueries = ['docs_with_nlp_annotations', 'time_on_task', 'activity', 'paste_metrics', 'copy_cut_metrics'];
 
 // ── Walkthrough step definitions ──────────────────────────────────────
@@ -289,6 +366,16 @@ function buildEmptyState () {
   });
 }
 
+// A single delegated listener handles every tile's expand button, so the
+// output does not need a pattern-matched n_clicks input per student.
+document.addEventListener('click', function (event) {
+  const button = event.target.closest?.('#wo-classroom-text-highlighter-output .wo-highlighter-student-expand');
+  if (!button) { return; }
+  const tile = button.closest('[data-student-id]');
+  if (!tile) { return; }
+  window.dash_clientside.set_props('wo-classroom-text-highlighter-expanded-student-id', { data: tile.dataset.studentId });
+}, true);
+
 window.dash_clientside.wo_classroom_text_highlighter = {
   // ── Walkthrough callbacks ────────────────────────────────────────────
 
@@ -352,17 +439,68 @@ window.dash_clientside.wo_classroom_text_highlighter = {
     ];
   },
 
+  /**
+   * Navigate the walkthrough and render the resulting step in one pass.
+   * On load, skip the walkthrough if the user has already seen it.
+   * Dismissing it records the seen flag in localStorage.
+   *
+   * Returns [step, seenFlag, ...renderWalkthroughStep outputs].
+   */
+  navigateAndRenderWalkthrough: function (nextClicks, backClicks, doneClicks, skipClicks, helpClicks, currentStep, hasSeenWalkthrough) {
+    const namespace = window.dash_clientside.wo_classroom_text_highlighter;
+    const noUpdate = window.dash_clientside.no_update;
+    const triggered = window.dash_clientside.callback_context?.triggered_id;
+
+    if (!triggered) {
+      // The step store starts at 0, which opens the walkthrough
+      const step = hasSeenWalkthrough ? -1 : currentStep;
+      return [hasSeenWalkthrough ? -1 : noUpdate, noUpdate, ...namespace.renderWalkthroughStep(step)];
+    }
+
+    const nextStep = namespace.navigateWalkthrough(nextClicks, backClicks, doneClicks, skipClicks, helpClicks, currentStep);
+    const step = nextStep === noUpdate ? currentStep : nextStep;
+    const seen = step === -1 && !hasSeenWalkthrough ? true : noUpdate;
+    return [nextStep, seen, ...namespace.renderWalkthroughStep(step)];
+  },
+
   computeAppliedHash: async function (appliedValue) {
     if (!appliedValue) { return ''; }
+    const serialized = JSON.stringify(appliedValue);
+    if (serialized === lastAppliedHashInput) {
+      return lastAppliedHash;
+    }
     const h = await hashObject(appliedValue);
+    lastAppliedHashInput = serialized;
+    lastAppliedHash = h;
     // console.log('[computeAppliedHash] computed hash:', h.substring(0, 12) + '...');
     return h;
   },
 
-  sendToLOConnection: function (wsReadyState, urlHash, docKwargs, appliedHash, nlpValue) {
+  /**
+   * Returns [appliedHash, legendChildren, toggleCount].
+   */
+  onAppliedOptionsChanged: async function (appliedValue, options, storedHash) {
+    const namespace = window.dash_clientside.wo_classroom_text_highlighter;
+    if (isInitialCall() && appliedValue && storedHash) {
+      // Both stores were restored from session storage together
+      lastAppliedHashInput = JSON.stringify(appliedValue);
+      lastAppliedHash = storedHash;
+      return [window.dash_clientside.no_update, ...namespace.updateLegend(appliedValue, options)];
+    }
+    const hash = await namespace.computeAppliedHash(appliedValue);
+    return [hash, ...namespace.updateLegend(appliedValue, options)];
+  },
+
+  sendToLOConnection: async function (wsReadyState, urlHash, docKwargs, appliedHash, nlpValue) {
     if (wsReadyState === undefined) {
       return window.dash_clientside.no_update;
     }
+    // Only the last call in a burst sends
+    const token = ++sendToken;
+    await new Promise(resolve => setTimeout(resolve, SEND_DEBOUNCE_MS));
+    if (token !== sendToken) {
+      return window.dash_clientside.no_update;
+    }
     if (wsReadyState.readyState === 1) {
       if (urlHash.length === 0) { return window.dash_clientside.no_update; }
       const decodedParams = decode_string_dict(urlHash.slice(1));
@@ -392,11 +530,6 @@ window.dash_clientside.wo_classroom_text_highlighter = {
     return window.dash_clientside.no_update;
   },
 
-  toggleOptionsModal: function (clicks, isOpen) {
-    if (!clicks) { return window.dash_clientside.no_update; }
-    return !isOpen;
-  },
-
   applyOptionsAndCloseModal: function (clicks, stagedValue, docKwargs) {
     if (!clicks) {
       return [
@@ -409,45 +542,111 @@ window.dash_clientside.wo_classroom_text_highlighter = {
     return [stagedValue, docKwargs, false];
   },
 
-  adjustTileSize: function (width, height, studentIds) {
-    const total = studentIds.length;
-    return Array(total).fill(styleStudentTile(width, height));
+  /**
+   * Mirror the applied options and document source into the options
+   * modal. Returns [staged value, source, assignment, date, time, title
+   * text]; the document source fields are left alone until one has been
+   * applied.
+   */
+  restoreStagedOptions: function (appliedValue, appliedDocSrc) {
+    const noUpdate = window.dash_clientside.no_update;
+    if (!appliedDocSrc?.src) {
+      return [appliedValue, noUpdate, noUpdate, noUpdate, noUpdate, noUpdate];
+    }
+    const kwargs = appliedDocSrc.kwargs ?? {};
+    let date = noUpdate;
+    let time = noUpdate;
+    if (kwargs.requested_timestamp) {
+      const when = new Date(Number(kwargs.requested_timestamp));
+      const pad = n => String(n).padStart(2, '0');
+      date = `${when.getFullYear()}-${pad(when.getMonth() + 1)}-${pad(when.getDate())}`;
+      time = `${pad(when.getHours())}:${pad(when.getMinutes())}`;
+    }
+    return [
+      appliedValue,
+      appliedDocSrc.src,
+      kwargs.assignment ?? noUpdate,
+      date,
+      time,
+      kwargs.title_text ?? noUpdate
+    ];
+  },
+
+  adjustTileSize: function (width, height) {
+    return {
+      '--wo-highlighter-tile-width': `${(100 - width) / width}%`,
+      '--wo-highlighter-tile-height': `${height}px`
+    };
   },
 
-  showHideHeader: function (show, ids) {
-    const total = ids.length;
-    return Array(total).fill(show ? 'd-none' : '');
+  showHideHeader: function (show) {
+    const outputClassName = 'd-flex justify-content-between flex-wrap';
+    return show ? outputClassName : `${outputClassName} wo-highlighter-hide-headers`;
   },
 
   updateCurrentOptionHash: function (appliedHash, ids) {
-    if (!appliedHash) {
+    if (isInitialCall()) { lastBroadcastHash = undefined; }
+    // Re-applying the same options writes the same hash to the store
+    if (!appliedHash || appliedHash === lastBroadcastHash) {
       return window.dash_clientside.no_update;
     }
+    lastBroadcastHash = appliedHash;
     const total = ids.length;
     // console.log('[updateCurrentOptionHash] Broadcasting hash to', total, 'tiles:', appliedHash.substring(0, 12) + '...');
     return Array(total).fill(appliedHash);
   },
 
-  populateOutput: function (wsStorageData, value, width, height, showName, options, optionHash) {
-    if (!wsStorageData?.students) {
-      return buildEmptyState();
+  /**
+   * Publish the students from the websocket store at most once per flush
+   * window. The call that opens the window publishes whatever arrived
+   * last when it closes; calls inside the window only record their data.
+   * The window is fixed, so a steady stream of updates cannot hold the
+   * grid back. The websocket store already merges per-student updates,
+   * so the latest value wins.
+   */
+  publishStudents: async function (wsStorageData) {
+    pendingStudents = wsStorageData?.students ?? null;
+    if (studentFlushPending) {
+      return window.dash_clientside.no_update;
     }
+    studentFlushPending = true;
+    await new Promise(resolve => setTimeout(resolve, STUDENT_FLUSH_MS));
+    studentFlushPending = false;
+    return pendingStudents;
+  },
 
-    const students = wsStorageData.students;
-    if (Object.keys(students).length === 0) {
+  populateOutput: function (students, value, options, optionHash) {
+    if (!students || Object.keys(students).length === 0) {
+      lastOutputLayoutKey = undefined;
       return buildEmptyState();
     }
 
     let output = [];
 
-    const selectedHighlights = fetchSelectedItemsFromOptions(value, options, 'highlight');
+    const highlights = compileHighlights(fetchSelectedItemsFromOptions(value, options, 'highlight'));
     const selectedMetrics = fetchSelectedItemsFromOptions(value, options, 'metric');
 
     // console.log('[populateOutput] Using hash:', optionHash ? optionHash.substring(0, 12) + '...' : 'NONE');
 
+    const settingsKey = JSON.stringify([value, optionHash]);
+    const layoutKey = JSON.stringify([Object.keys(students), settingsKey]);
+    const tileCache = new Map();
+    const changedTiles = [];
+
     for (const student in students) {
       const selectedDocument = students[student].doc_id || Object.keys(students[student].documents || {})[0] || '';
       const documentTitle = students[student]?.availableDocuments?.[selectedDocument]?.title ?? selectedDocument ?? '';
+      const doc = students[student].documents[selectedDocument];
+      const cached = studentTileCache.get(student);
+      const docStatus = docStatusSignature(doc);
+      if (cached && cached.doc === doc && cached.docStatus === docStatus &&
+          cached.settingsKey === settingsKey &&
+          cached.selectedDocument === selectedDocument && cached.documentTitle === documentTitle &&
+          cached.studentHash === doc?.option_hash_docs_with_nlp_annotations) {
+        tileCache.set(student, cached);
+        output = output.concat(cached.tile);
+        continue;
+      }
       const studentTileChild = createDashComponent(
         DASH_HTML_COMPONENTS, 'Div',
         {
@@ -455,7 +654,7 @@ window.dash_clientside.wo_classroom_text_highlighter = {
             createProcessTags({ ...students[student].documents[selectedDocument] }, selectedMetrics),
             createDashComponent(
               LO_DASH_REACT_COMPONENTS, 'WOAnnotatedText',
-              formatStudentData({ ...students[student].documents[selectedDocument] }, selectedHighlights)
+              formatStudentData({ ...students[student].documents[selectedDocument] }, highlights)
             )
           ]
         }
@@ -463,7 +662,6 @@ window.dash_clientside.wo_classroom_text_highlighter = {
       const studentTile = createDashComponent(
         LO_DASH_REACT_COMPONENTS, 'WOStudentTextTile',
         {
-          showName,
           profile: students[student].documents[selectedDocument]?.profile || {},
           selectedDocument,
           documentTitle,
@@ -475,7 +673,7 @@ window.dash_clientside.wo_classroom_text_highlighter = {
           additionalButtons: createDashComponent(
             DASH_BOOTSTRAP_COMPONENTS, 'Button',
             {
-              id: { type: 'WOStudentTileExpand', index: student },
+              className: 'wo-highlighter-student-expand',
               children: createDashComponent(DASH_HTML_COMPONENTS, 'I', { className: 'fas fa-expand' }),
               color: 'transparent'
             }
@@ -485,36 +683,70 @@ window.dash_clientside.wo_classroom_text_highlighter = {
       const tileWrapper = createDashComponent(
         DASH_HTML_COMPONENTS, 'Div',
         {
-          className: 'mb-2',
+          className: 'mb-2 wo-highlighter-student-tile',
           children: [
             studentTile,
           ],
           id: { type: 'WOStudentTile', index: student },
-          style: styleStudentTile(width, height)
+          'data-student-id': student
         }
       );
+      tileCache.set(student, {
+        doc,
+        docStatus,
+        settingsKey,
+        selectedDocument,
+        documentTitle,
+        studentHash: doc?.option_hash_docs_with_nlp_annotations,
+        tile: tileWrapper
+      });
+      changedTiles.push([student, tileWrapper]);
       output = output.concat(tileWrapper);
     }
+    // Dropping the old map also evicts students no longer in the payload
+    studentTileCache = tileCache;
+
+    // Same students in the same order with the same settings: only swap
+    // the contents of the tiles that changed, instead of replacing every
+    // child of the output.
+    if (!isInitialCall() && layoutKey === lastOutputLayoutKey) {
+      changedTiles.forEach(([student, tile]) => {
+        window.dash_clientside.set_props({ type: 'WOStudentTile', index: student }, { children: tile.props.children });
+      });
+      return window.dash_clientside.no_update;
+    }
+    lastOutputLayoutKey = layoutKey;
     return output;
   },
 
   updateAlertWithError: function (error) {
+    // The error dump output is only registered in dev mode
+    const withDump = window.dash_clientside.callback_context.outputs_list.length > 2;
     if (Object.keys(error).length === 0) {
-      return ['', false, ''];
+      lastErrorDump = undefined;
+      return withDump ? ['', false, null] : ['', false];
     }
     const text = 'Oops! Something went wrong ' +
                  "on our end. We've noted the " +
                  'issue. Please try again later, or consider ' +
                  'exploring a different dashboard for now. ' +
                  'Thanks for your patience!';
-    return [text, true, error];
+    if (!withDump) {
+      return [text, true];
+    }
+    const serialized = JSON.stringify(error);
+    if (serialized === lastErrorDump) {
+      return [text, true, window.dash_clientside.no_update];
+    }
+    lastErrorDump = serialized;
+    return [text, true, createDashComponent(DASH_RENDERJSON, 'DashRenderjson', { data: error })];
   },
 
   addPreset: function (clicks, name, options, store) {
-    if (!clicks) { return store; }
-    const copy = { ...store };
-    copy[name] = options;
-    return copy;
+    // Writing the store back unchanged would still persist it to
+    // localStorage and rebuild the preset tray on the server
+    if (!clicks) { return window.dash_clientside.no_update; }
+    return { ...store, [name]: options };
   },
 
   applyPreset: function (clicks, data) {
@@ -524,18 +756,25 @@ window.dash_clientside.wo_classroom_text_highlighter = {
     return data[preset];
   },
 
-  updateLoadingInformation: function (wsStorageData, appliedHash) {
+  updateLoadingInformation: function (students, appliedHash) {
     const noLoading = [false, 0, ''];
+    const initial = isInitialCall();
+    const skipIfUnchanged = (key, output) => {
+      if (!initial && key === lastLoadingKey) {
+        return window.dash_clientside.no_update;
+      }
+      lastLoadingKey = key;
+      return output;
+    };
 
-    if (!wsStorageData?.students || !appliedHash) {
-      return noLoading;
+    if (!students || !appliedHash) {
+      return skipIfUnchanged('done', noLoading);
     }
 
-    const students = wsStorageData.students;
     const totalStudents = Object.keys(students).length;
 
     if (totalStudents === 0) {
-      return noLoading;
+      return skipIfUnchanged('done', noLoading);
     }
 
     let returnedResponses = 0;
@@ -550,40 +789,24 @@ window.dash_clientside.wo_classroom_text_highlighter = {
     // console.log(`[updateLoadingInformation] ${returnedResponses}/${totalStudents} responded for hash=${appliedHash.substring(0, 12)}...`);
 
     if (totalStudents === returnedResponses) {
-      return noLoading;
+      return skipIfUnchanged('done', noLoading);
     }
 
     const loadingProgress = returnedResponses / totalStudents + 0.1;
     const outputText = `Fetching responses from server. This will take a few minutes. (${returnedResponses}/${totalStudents} received)`;
-    return [true, loadingProgress, outputText];
+    return skipIfUnchanged(`${returnedResponses}/${totalStudents}`, [true, loadingProgress, outputText]);
   },
 
   /**
-   * When a student tile expand button is clicked, record which student
-   * was selected and open the modal.
+   * Open the modal once a student has been selected by the delegated
+   * expand click listener.
    *
-   * Returns [selectedStudentId, isModalOpen, showIdentity].
+   * Returns [isModalOpen, showIdentity].
    */
-  expandCurrentStudent: function (clicks, ids, isModalOpen, currentStudentId, globalShowName) {
-    const triggeredItem = window.dash_clientside.callback_context?.triggered_id ?? null;
-    if (!triggeredItem) { return window.dash_clientside.no_update; }
-
-    // Only act on actual expand button clicks
-    if (triggeredItem?.type !== 'WOStudentTileExpand') {
-      return window.dash_clientside.no_update;
-    }
-
-    // Make sure something was actually clicked (not just initial callback fire)
-    const hasActualClick = clicks && clicks.some(c => c !== undefined && c !== null && c > 0);
-    if (!hasActualClick) { return window.dash_clientside.no_update; }
-
-    const id = triggeredItem?.index;
-    const index = ids.findIndex(item => item.index === id);
-    if (index === -1) { return window.dash_clientside.no_update; }
-
+  expandCurrentStudent: function (studentId, globalShowName) {
+    if (!studentId) { return window.dash_clientside.no_update; }
     const showIdentity = globalShowName !== undefined ? globalShowName : true;
-
-    return [id, true, showIdentity];
+    return [true, showIdentity];
   },
 
   /**
@@ -593,13 +816,13 @@ window.dash_clientside.wo_classroom_text_highlighter = {
    *
    * Returns [studentName, docTitle, childContent].
    */
-  renderExpandedStudent: function (wsStorageData, selectedStudentId, isModalOpen, value, options, optionHash) {
+  renderExpandedStudent: function (students, selectedStudentId, isModalOpen, value, options) {
     // Don't do anything if the modal isn't open
     if (!isModalOpen) {
       return window.dash_clientside.no_update;
     }
 
-    if (!selectedStudentId || !wsStorageData?.students) {
+    if (!selectedStudentId || !students) {
       return [
         '',
         '',
@@ -610,7 +833,7 @@ window.dash_clientside.wo_classroom_text_highlighter = {
       ];
     }
 
-    const student = wsStorageData.students[selectedStudentId];
+    const student = students[selectedStudentId];
     if (!student) {
       return [
         'Student',
@@ -642,7 +865,7 @@ window.dash_clientside.wo_classroom_text_highlighter = {
       .filter(Boolean)
       .join(' ') || 'Student';
 
-    const selectedHighlights = fetchSelectedItemsFromOptions(value, options, 'highlight');
+    const highlights = compileHighlights(fetchSelectedItemsFromOptions(value, options, 'highlight'));
     const selectedMetrics = fetchSelectedItemsFromOptions(value, options, 'metric');
 
     const childContent = createDashComponent(
@@ -652,7 +875,7 @@ window.dash_clientside.wo_classroom_text_highlighter = {
           createProcessTags({ ...doc }, selectedMetrics),
           createDashComponent(
             LO_DASH_REACT_COMPONENTS, 'WOAnnotatedText',
-            formatStudentData({ ...doc }, selectedHighlights)
+            formatStudentData({ ...doc }, highlights)
           )
         ]
       }
@@ -661,20 +884,41 @@ window.dash_clientside.wo_classroom_text_highlighter = {
     return [studentName, documentName, childContent];
   },
 
-  toggleExpandedStudentIdentity: function (clicks, currentValue) {
-    if (!clicks) { return window.dash_clientside.no_update; }
-    return !currentValue;
-  },
-
-  renderExpandedStudentIdentity: function (showIdentity) {
-    const visible = { };
-    const hidden = { display: 'none' };
-
-    const titleStyle = showIdentity ? visible : hidden;
-    const docTitleStyle = showIdentity ? visible : hidden;
-    const iconClass = showIdentity ? 'fas fa-eye' : 'fas fa-eye-slash';
+  /**
+   * Render the student tiles, the expanded student and the loading
+   * progress from one student update. Each part only runs for the
+   * inputs it depends on.
+   *
+   * Returns [populateOutput output, ...renderExpandedStudent outputs,
+   * ...updateLoadingInformation outputs].
+   */
+  onStudentsChanged: function (students, selectedStudentId, appliedHash, isModalOpen, value, options) {
+    const namespace = window.dash_clientside.wo_classroom_text_highlighter;
+    const noUpdate = window.dash_clientside.no_update;
+    const triggered = (window.dash_clientside.callback_context?.triggered ?? []).map(t => t.prop_id);
+    const studentsChanged = isInitialCall() || triggered.includes('wo-classroom-text-highlighter-students.data');
+    const expandedChanged = triggered.includes('wo-classroom-text-highlighter-expanded-student-id.data') ||
+      triggered.includes('wo-classroom-text-highlighter-expanded-student-modal.is_open');
+    const hashChanged = triggered.includes('wo-classroom-text-highlighter-options-applied-hash.data');
+    const optionsChanged = triggered.includes('wo-classroom-text-highlighter-options-text-information.data');
+
+    // Opening the modal for another student leaves the tiles alone
+    const tiles = studentsChanged || optionsChanged || hashChanged
+      ? namespace.populateOutput(students, value, options, appliedHash)
+      : noUpdate;
+
+    let expanded = [noUpdate, noUpdate, noUpdate];
+    if (studentsChanged || expandedChanged) {
+      const rendered = namespace.renderExpandedStudent(students, selectedStudentId, isModalOpen, value, options);
+      if (rendered !== noUpdate) { expanded = rendered; }
+    }
 
-    return [titleStyle, docTitleStyle, iconClass];
+    let loading = [noUpdate, noUpdate, noUpdate];
+    if (studentsChanged || hashChanged) {
+      const updated = namespace.updateLoadingInformation(students, appliedHash);
+      if (updated !== noUpdate) { loading = updated; }
+    }
+    return [tiles, ...expanded, ...loading];
   },
 
   updateLegend: function (value, options) {
@@ -682,6 +926,13 @@ window.dash_clientside.wo_classroom_text_highlighter = {
     const selectedMetrics = fetchSelectedItemsFromOptions(value, options, 'metric');
     const total = selectedHighlights.length + selectedMetrics.length;
 
+    // The legend only shows highlight labels and colors, plus the count
+    const key = `${total}|${selectedHighlights.map(h => `${h.id}:${h.highlight.color}`).join(',')}`;
+    if (!isInitialCall() && key === lastLegendKey) {
+      return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+    }
+    lastLegendKey = key;
+
     if (selectedHighlights.length === 0) {
       return [
         'No highlights selected yet. Click "Choose What to Highlight" in the toolbar, select your options, then click "Run."',
@@ -707,34 +958,4 @@ window.dash_clientside.wo_classroom_text_highlighter = {
     output = output.concat('Note: words in the student text may have multiple highlights. Hover over a word for the full list of which options apply.');
     return [output, total];
   },
-
-  /**
-   * Determine the initial walkthrough step based on whether the user
-   * has previously completed/skipped it (persisted in localStorage).
-   * Also writes back to localStorage when the walkthrough is dismissed.
-   *
-   * Returns [walkthroughStep, seenFlag].
-   */
-  initWalkthroughFromStorage: function (step, hasSeenWalkthrough) {
-    // On initial load (no trigger), check localStorage flag
-    const triggered = window.dash_clientside.callback_context?.triggered_id;
-
-    if (!triggered) {
-      // Initial load: if they've seen it before, keep it closed
-      if (hasSeenWalkthrough) {
-        return [-1, true];
-      }
-      // First visit: open at step 0
-      return [0, false];
-    }
-
-    // Step changed (user navigated/dismissed/reopened)
-    if (step === -1) {
-      // User dismissed or completed — mark as seen
-      return [-1, true];
-    }
-
-    // User reopened via help button or is navigating
-    return [step, hasSeenWalkthrough];
-  },
 };
@@ -4,7 +4,7 @@ for the classroom highlight dashboard.
 '''
 from dash import html, dcc, clientside_callback, ClientsideFunction, Output, Input, State, ALL
 import dash_bootstrap_components as dbc
-import dash_renderjson
+import dash_renderjson  # registers DashRenderjson, which assets/scripts.js builds on demand
 import lo_dash_react_components as lodrc
 
 import learning_observer.settings
@@ -16,6 +16,7 @@ DEBUG_FLAG = learning_observer.settings.RUN_MODE == learning_observer.settings.R
 _prefix = 'wo-classroom-text-highlighter'
 _namespace = 'wo_classroom_text_highlighter'
 _websocket = f'{_prefix}-websocket'
+_students = f'{_prefix}-students'
 _output = f'{_prefix}-output'
 
 # loading message/bar DOM ids
@@ -171,19 +172,32 @@ options_modal = dbc.Modal([
     style={'maxHeight': '100vh'})
 
 # Hidden store that holds the "applied" text information value.
+# The applied options, their hash and the applied document source are
+# kept for the browser session so a reload restores them without hashing
+# the options again (see `restoreStagedOptions` for the options modal).
 applied_options_store = dcc.Store(
     id=_options_text_information,
-    data=wo_classroom_text_highlighter.options.DEFAULT_VALUE
+    data=wo_classroom_text_highlighter.options.DEFAULT_VALUE,
+    storage_type='session'
 )
 
 # Hidden store for the pre-computed hash of the applied options.
 applied_option_hash_store = dcc.Store(
     id=_applied_option_hash,
-    data=''
+    data='',
+    storage_type='session'
 )
 applied_doc_src_store = dcc.Store(
     id=_applied_doc_src,
-    data={}
+    data={},
+    storage_type='session'
+)
+
+# Students from the websocket store, published at most once per flush
+# window so bursts of messages only rebuild the UI once.
+students_store = dcc.Store(
+    id=_students,
+    data=None
 )
 
 # Legend
@@ -249,10 +263,13 @@ _alert = f'{_prefix}-alert'
 _alert_text = f'{_prefix}-alert-text'
 _alert_error_dump = f'{_prefix}-alert-error-dump'
 
+# In dev mode the raw error is rendered with `DashRenderjson`, which is
+# only built into the container once an error comes in. Outside of dev
+# mode the container and its callback output are left out entirely.
 alert_component = dbc.Alert([
     html.Div(id=_alert_text),
-    html.Div(dash_renderjson.DashRenderjson(id=_alert_error_dump), className='' if DEBUG_FLAG else 'd-none')
-], id=_alert, color='danger', is_open=False)
+] + ([html.Div(id=_alert_error_dump)] if DEBUG_FLAG else []),
+    id=_alert, color='danger', is_open=False)
 
 # Panels layout ID
 _panels_layout = f'{_prefix}-panels-layout'
@@ -282,64 +299,50 @@ input_group = dbc.InputGroup([
 ], class_name='align-items-center')
 
 
+_page = html.Div([
+    html.H1('Writing Observer — Classroom Text Highlighter'),
+    alert_component,
+    applied_options_store,
+    applied_option_hash_store,
+    applied_doc_src_store,
+    students_store,
+    expanded_student_show_identity_store,
+    expanded_student_id_store,
+    walkthrough_store,
+    walkthrough_seen_store,
+    walkthrough_modal,
+    options_modal,
+    expanded_student_modal,
+    html.Div([
+        html.Div(input_group, className='d-flex me-2'),
+        html.Div(loading_component, className='d-flex')
+    ], className='d-flex sticky-top pb-1 bg-light'),
+    lodrc.LOPanelLayout(
+        html.Div(id=_output, className='d-flex justify-content-between flex-wrap'),
+        panels=[],
+        id=_panels_layout, shown=[]
+    ),
+])
+
+
 def layout():
-    page_layout = html.Div([
-        html.H1('Writing Observer — Classroom Text Highlighter'),
-        alert_component,
-        applied_options_store,
-        applied_option_hash_store,
-        applied_doc_src_store,
-        expanded_student_show_identity_store,
-        expanded_student_id_store,
-        walkthrough_store,
-        walkthrough_seen_store,
-        walkthrough_modal,
-        options_modal,
-        expanded_student_modal,
-        html.Div([
-            html.Div(input_group, className='d-flex me-2'),
-            html.Div(loading_component, className='d-flex')
-        ], className='d-flex sticky-top pb-1 bg-light'),
-        lodrc.LOPanelLayout(
-            html.Div(id=_output, className='d-flex justify-content-between flex-wrap'),
-            panels=[],
-            id=_panels_layout, shown=[]
-        ),
-    ])
-    return page_layout
+    '''
+    Generic layout function to create dashboard
+    '''
+    return _page
 
 
 # ══════════════════════════════════════════════════════════════════════
 # Walkthrough callbacks
 # ══════════════════════════════════════════════════════════════════════
 
-# On load or when step changes, sync with localStorage to decide
-# whether to show the walkthrough.
-clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='initWalkthroughFromStorage'),
-    Output(_walkthrough_store, 'data', allow_duplicate=True),
-    Output(_walkthrough_seen_store, 'data'),
-    Input(_walkthrough_store, 'data'),
-    State(_walkthrough_seen_store, 'data'),
-    prevent_initial_call='initial_duplicate',
-)
-
-# Navigate between walkthrough steps (next / back / done / skip / help reopen)
+# Navigate between walkthrough steps and render the current step. On
+# load this skips the walkthrough if it was already seen, and dismissing
+# it records that in localStorage.
 clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='navigateWalkthrough'),
+    ClientsideFunction(namespace=_namespace, function_name='navigateAndRenderWalkthrough'),
     Output(_walkthrough_store, 'data'),
-    Input(_walkthrough_next, 'n_clicks'),
-    Input(_walkthrough_back, 'n_clicks'),
-    Input(_walkthrough_done, 'n_clicks'),
-    Input(_walkthrough_skip, 'n_clicks'),
-    Input(_help_button, 'n_clicks'),
-    State(_walkthrough_store, 'data'),
-    prevent_initial_call=True,
-)
-
-# Render the correct step content in the walkthrough modal (unchanged)
-clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='renderWalkthroughStep'),
+    Output(_walkthrough_seen_store, 'data'),
     Output(_walkthrough_title, 'children'),
     Output(_walkthrough_body, 'children'),
     Output(_walkthrough_back, 'disabled'),
@@ -347,7 +350,13 @@ clientside_callback(
     Output(_walkthrough_done, 'style'),
     Output(_walkthrough_counter, 'children'),
     Output(_walkthrough_modal, 'is_open'),
-    Input(_walkthrough_store, 'data'),
+    Input(_walkthrough_next, 'n_clicks'),
+    Input(_walkthrough_back, 'n_clicks'),
+    Input(_walkthrough_done, 'n_clicks'),
+    Input(_walkthrough_skip, 'n_clicks'),
+    Input(_help_button, 'n_clicks'),
+    State(_walkthrough_store, 'data'),
+    State(_walkthrough_seen_store, 'data'),
 )
 
 # Send the initial state based on the url hash to LO.
@@ -361,11 +370,16 @@ clientside_callback(
     State(_options_text_information, 'data')
 )
 
-# When the applied options store changes, compute and store the hash.
+# When the applied options store changes, compute and store the hash
+# and update the legend.
 clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='computeAppliedHash'),
+    ClientsideFunction(namespace=_namespace, function_name='onAppliedOptionsChanged'),
     Output(_applied_option_hash, 'data'),
+    Output(_legend_children, 'children'),
+    Output(_options_toggle_count, 'children'),
     Input(_options_text_information, 'data'),
+    State(_options_text_information_staged, 'options'),
+    State(_applied_option_hash, 'data')
 )
 
 # When Run is clicked, apply staged options, snapshot doc source, and close modal.
@@ -380,46 +394,58 @@ clientside_callback(
     prevent_initial_call=True
 )
 
-# Build the UI
+# The applied stores are restored from the browser session on reload.
+# Copy them back into the options modal, so it shows what is applied and
+# Run does not quietly revert to the defaults.
 clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='populateOutput'),
-    Output(_output, 'children'),
-    Input(lodrc.LOConnectionAIO.ids.ws_store(_websocket), 'data'),
+    ClientsideFunction(namespace=_namespace, function_name='restoreStagedOptions'),
+    Output(_options_text_information_staged, 'value', allow_duplicate=True),
+    Output(lodrc.LODocumentSourceSelectorAIO.ids.source_selector(_options_doc_src), 'value', allow_duplicate=True),
+    Output(lodrc.LODocumentSourceSelectorAIO.ids.assignment_input(_options_doc_src), 'value'),
+    Output(lodrc.LODocumentSourceSelectorAIO.ids.date_input(_options_doc_src), 'date'),
+    Output(lodrc.LODocumentSourceSelectorAIO.ids.timestamp_input(_options_doc_src), 'value'),
+    Output(lodrc.LODocumentSourceSelectorAIO.ids.title_text_input(_options_doc_src), 'value'),
     Input(_options_text_information, 'data'),
-    Input(_options_width, 'value'),
-    Input(_options_height, 'value'),
-    Input(_options_hide_header, 'value'),
-    State(_options_text_information_staged, 'options'),
-    State(_applied_option_hash, 'data'),
+    Input(_applied_doc_src, 'data'),
+    prevent_initial_call='initial_duplicate'
+)
+
+# Coalesce websocket updates before they reach the UI
+clientside_callback(
+    ClientsideFunction(namespace=_namespace, function_name='publishStudents'),
+    Output(_students, 'data'),
+    Input(lodrc.LOConnectionAIO.ids.ws_store(_websocket), 'data')
 )
 
-# Toggle the options modal open
+# Open the options modal. The backdrop covers the toggle while the modal
+# is open, so closing is left to the modal itself.
 clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='toggleOptionsModal'),
+    '''function (clicks) {
+        if (!clicks) { return window.dash_clientside.no_update; }
+        return true;
+    }''',
     Output(_options_modal, 'is_open'),
     Input(_options_toggle, 'n_clicks'),
-    State(_options_modal, 'is_open'),
     prevent_initial_call=True
 )
 
-# Adjust student tile size
+# Tile size and header visibility are set once on the output, and the
+# student tiles pick them up through CSS (see assets/general.css).
 clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='adjustTileSize'),
-    Output({'type': 'WOStudentTile', 'index': ALL}, 'style'),
+    Output(_output, 'style'),
     Input(_options_width, 'value'),
     Input(_options_height, 'value'),
-    State({'type': 'WOStudentTile', 'index': ALL}, 'id'),
 )
 
-# Handle showing or hiding the student tile header
 clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='showHideHeader'),
-    Output({'type': 'WOStudentTextTile', 'index': ALL}, 'showName'),
+    Output(_output, 'className'),
     Input(_options_hide_header, 'value'),
-    State({'type': 'WOStudentTextTile', 'index': ALL}, 'id'),
 )
 
-# When applied hash changes, push to all existing student tiles.
+# When applied hash changes, push to all existing student tiles. Each
+# tile compares it against its student's hash to show a loading state.
 clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='updateCurrentOptionHash'),
     Output({'type': 'WOStudentTextTile', 'index': ALL}, 'currentOptionHash'),
@@ -427,37 +453,45 @@ clientside_callback(
     State({'type': 'WOStudentTextTile', 'index': ALL}, 'id'),
 )
 
-# ── Expand: record which student was clicked, open modal ──────────────
+# ── Expand: open the modal for the clicked student ────────────────────
+# The student id is written by a delegated click listener on the output
+# (see assets/scripts.js), so no per-tile inputs are needed here.
 clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='expandCurrentStudent'),
-    Output(_expanded_student_id, 'data'),
     Output(_expanded_student_modal, 'is_open'),
     Output(_expanded_student_show_identity, 'data'),
-    Input({'type': 'WOStudentTileExpand', 'index': ALL}, 'n_clicks'),
-    State({'type': 'WOStudentTile', 'index': ALL}, 'id'),
-    State(_expanded_student_modal, 'is_open'),
-    State(_expanded_student_id, 'data'),
+    Input(_expanded_student_id, 'data'),
     State(_options_hide_header, 'value'),
     prevent_initial_call=True
 )
 
-# ── Expand: reactively render content from live websocket data ────────
+# ── Render the student tiles, expanded student and loading progress ───
+# One callback builds everything that follows live websocket data. The
+# modal's `is_open` is an Input so the first render waits for
+# `expandCurrentStudent` to open it for the clicked student.
 clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='renderExpandedStudent'),
+    ClientsideFunction(namespace=_namespace, function_name='onStudentsChanged'),
+    Output(_output, 'children'),
     Output(_expanded_student_title, 'children'),
     Output(_expanded_student_doc_title, 'children'),
     Output(_expanded_student_child, 'children'),
-    Input(lodrc.LOConnectionAIO.ids.ws_store(_websocket), 'data'),
+    Output(_loading_collapse, 'is_open'),
+    Output(_loading_progress, 'value'),
+    Output(_loading_information, 'children'),
+    Input(_students, 'data'),
     Input(_expanded_student_id, 'data'),
-    State(_expanded_student_modal, 'is_open'),
-    State(_options_text_information, 'data'),
+    Input(_applied_option_hash, 'data'),
+    Input(_expanded_student_modal, 'is_open'),
+    Input(_options_text_information, 'data'),
     State(_options_text_information_staged, 'options'),
-    State(_applied_option_hash, 'data'),
 )
 
 # Toggle identity visibility within the expanded modal
 clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='toggleExpandedStudentIdentity'),
+    '''function (clicks, currentValue) {
+        if (!clicks) { return window.dash_clientside.no_update; }
+        return !currentValue;
+    }''',
     Output(_expanded_student_show_identity, 'data', allow_duplicate=True),
     Input(_expanded_student_show_identity_toggle, 'n_clicks'),
     State(_expanded_student_show_identity, 'data'),
@@ -466,7 +500,10 @@ clientside_callback(
 
 # Render identity visibility in the expanded modal (hide/show name, doc title, icon)
 clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='renderExpandedStudentIdentity'),
+    '''function (showIdentity) {
+        const style = showIdentity ? {} : { display: 'none' };
+        return [style, style, showIdentity ? 'fas fa-eye' : 'fas fa-eye-slash'];
+    }''',
     Output(_expanded_student_title, 'style'),
     Output(_expanded_student_doc_title, 'style'),
     Output(f'{_expanded_student_show_identity_toggle}-icon', 'className'),
@@ -478,7 +515,7 @@ clientside_callback(
     ClientsideFunction(namespace=_namespace, function_name='updateAlertWithError'),
     Output(_alert_text, 'children'),
     Output(_alert, 'is_open'),
-    Output(_alert_error_dump, 'data'),
+    *([Output(_alert_error_dump, 'children')] if DEBUG_FLAG else []),
     Input(lodrc.LOConnectionAIO.ids.error_store(_websocket), 'data')
 )
 
@@ -489,7 +526,8 @@ clientside_callback(
     Input(wo_classroom_text_highlighter.preset_component._add_button, 'n_clicks'),
     State(wo_classroom_text_highlighter.preset_component._add_input, 'value'),
     State(_options_text_information_staged, 'value'),
-    State(wo_classroom_text_highlighter.preset_component._store, 'data')
+    State(wo_classroom_text_highlighter.preset_component._store, 'data'),
+    prevent_initial_call=True
 )
 
 # Apply clicked preset to the staged settings
@@ -500,22 +538,3 @@ clientside_callback(
     State(wo_classroom_text_highlighter.preset_component._store, 'data'),
     prevent_initial_call=True
 )
-
-# Update loading information
-clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='updateLoadingInformation'),
-    Output(_loading_collapse, 'is_open'),
-    Output(_loading_progress, 'value'),
-    Output(_loading_information, 'children'),
-    Input(lodrc.LOConnectionAIO.ids.ws_store(_websocket), 'data'),
-    Input(_applied_option_hash, 'data')
-)
-
-# Update legend
-clientside_callback(
-    ClientsideFunction(namespace=_namespace, function_name='updateLegend'),
-    Output(_legend_children, 'children'),
-    Output(_options_toggle_count, 'children'),
-    Input(_options_text_information, 'data'),
-    State(_options_text_information_staged, 'options')
-)
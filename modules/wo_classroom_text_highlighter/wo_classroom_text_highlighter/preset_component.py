@@ -9,6 +9,7 @@ import wo_classroom_text_highlighter.options
 
 _prefix = 'option-preset'
 _store = f'{_prefix}-store'
+_names = f'{_prefix}-names'
 _add_input = f'{_prefix}-add-input'
 _add_help = f'{_prefix}-add-help'
 _add_button = f'{_prefix}-add-button'
@@ -35,20 +36,33 @@ def create_layout():
         html.Div(id=_tray),
         # TODO we ought to store the presets on the server instead of browser storage
         # TODO we need to migrate the old options to new ones
-        dcc.Store(id=_store, data=wo_classroom_text_highlighter.options.PRESETS, storage_type='local')
+        dcc.Store(id=_store, data=wo_classroom_text_highlighter.options.PRESETS, storage_type='local'),
+        dcc.Store(id=_names)
     ], id=_prefix)
 
 
+# the tray only needs preset names, so avoid sending every
+# preset's options to the server whenever the store changes
+clientside_callback(
+    '''function (data) {
+        if (!data) { return window.dash_clientside.no_update; }
+        return Object.keys(data);
+    }''',
+    Output(_names, 'data'),
+    Input(_store, 'data')
+)
+
+
 # disabled add preset when name already exists
 clientside_callback(
-    '''function (value, curr) {
+    '''function (value, names) {
         if (value.length === 0) { return true; }
-        if (Object.keys(curr).includes(value)) { return true; }
+        if ((names ?? []).includes(value)) { return true; }
         return false;
     }''',
     Output(_add_button, 'disabled'),
     Input(_add_input, 'value'),
-    State(_store, 'data')
+    State(_names, 'data')
 )
 
 # clear input on add
@@ -79,13 +93,12 @@ def create_tray_item(preset):
 
 @callback(
     Output(_tray, 'children'),
-    Input(_store, 'modified_timestamp'),
-    State(_store, 'data')
+    Input(_names, 'data')
 )
-def create_tray_items_from_store(ts, data):
-    if ts is None and data is None:
+def create_tray_items_from_store(names):
+    if names is None:
         raise exceptions.PreventUpdate
-    return [html.Div(create_tray_item(preset), className='d-inline-block me-1 mb-1') for preset in reversed(data.keys())]
+    return [html.Div(create_tray_item(preset), className='d-inline-block me-1 mb-1') for preset in reversed(names)]
 
 
 @callback(
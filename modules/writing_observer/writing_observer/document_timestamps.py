@@ -1,4 +1,5 @@
-import bisect
+import functools
+import operator
 
 import learning_observer.communication_protocol.integration
 
@@ -21,6 +22,50 @@ def select_source(sources, source):
     return sources[source]
 
 
+@functools.lru_cache(maxsize=256)
+def _normalize_title_text(title_text):
+    '''
+    Dashboards repeat the same `title_text` on every query, so the
+    normalized form is cached.
+    '''
+    return title_text.strip().lower()
+
+
+def _lowercase_title(metadata):
+    return str(metadata.get('title', '') or '').lower()
+
+
+def _last_access(metadata):
+    try:
+        return float(metadata.get('last_access'))
+    except (TypeError, ValueError):
+        return -1
+
+
+def _latest_doc_with_title(docs, title_text):
+    '''
+    Most recently accessed document whose lowercased title contains
+    `title_text`. Documents without a usable `last_access` are never
+    selected.
+    '''
+    matches = (
+        (_last_access(metadata), doc_id)
+        for doc_id, metadata in docs.items()
+        if title_text in _lowercase_title(metadata)
+    )
+    best_last_access, best_doc_id = max(matches, key=operator.itemgetter(0), default=(-1, ''))
+    return best_doc_id if best_last_access > -1 else ''
+
+
+def _doc_at_timestamp(timestamps, requested_timestamp):
+    '''
+    Document of the latest timestamp at or before `requested_timestamp`.
+    A single pass instead of sorting every student's timestamps.
+    '''
+    target_ts = max((ts for ts in timestamps if ts <= requested_timestamp), default=None)
+    return '' if target_ts is None else timestamps[target_ts]
+
+
 @learning_observer.communication_protocol.integration.publish_function('writing_observer.fetch_doc_by_title_text')
 async def fetch_doc_by_title_text(document_lists, kwargs=None):
     '''
@@ -29,33 +74,16 @@ async def fetch_doc_by_title_text(document_lists, kwargs=None):
     '''
     if kwargs is None:
         kwargs = {}
-    title_text = (kwargs.get('title_text') or '').strip().lower()
+    title_text = _normalize_title_text(kwargs.get('title_text') or '')
 
-    async for student in document_lists:
-        docs = student.get('docs', {})
-        student['doc_id'] = ''
-        if not title_text:
+    if not title_text:
+        async for student in document_lists:
+            student['doc_id'] = ''
             yield student
-            continue
-
-        best_doc_id = ''
-        best_last_access = -1
-        for doc_id, metadata in docs.items():
-            title = str(metadata.get('title', '') or '').lower()
-            if title_text not in title:
-                continue
-
-            last_access = metadata.get('last_access')
-            try:
-                last_access = float(last_access)
-            except (TypeError, ValueError):
-                last_access = -1
-
-            if last_access > best_last_access:
-                best_last_access = last_access
-                best_doc_id = doc_id
-
-        student['doc_id'] = best_doc_id
+        return
+
+    async for student in document_lists:
+        student['doc_id'] = _latest_doc_with_title(student.get('docs', {}), title_text)
         yield student
 
 
@@ -70,20 +98,15 @@ async def fetch_doc_at_timestamp(overall_timestamps, kwargs=None):
     if kwargs is None:
         kwargs = {}
     requested_timestamp = kwargs.get('requested_timestamp', None)
-    async for student in overall_timestamps:
-        timestamps = student.get('timestamps', {})
-        student['doc_id'] = ''
-        if requested_timestamp is None:
-            # perhaps this should fetch the latest doc id instead
-            yield student
-            continue
-        sorted_ts = sorted(timestamps.keys())
-        bisect_index = bisect.bisect_right(sorted_ts, requested_timestamp) - 1
-        if bisect_index < 0:
+    if requested_timestamp is None:
+        # perhaps this should fetch the latest doc id instead
+        async for student in overall_timestamps:
+            student['doc_id'] = ''
             yield student
-            continue
-        target_ts = sorted_ts[bisect_index]
-        student['doc_id'] = timestamps[target_ts]
+        return
+
+    async for student in overall_timestamps:
+        student['doc_id'] = _doc_at_timestamp(student.get('timestamps', {}), requested_timestamp)
         yield student
 
 
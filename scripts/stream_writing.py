@@ -10,6 +10,7 @@ Usage:
                       [--text-length=5]
                       [--fake-name]
                       [--gpt3=type]
+                      [--verbose]
 
 Options:
     --url=url                URL to connect [default: http://localhost:8888/wsapi/in/]
@@ -21,6 +22,7 @@ Options:
     --text-length=n          Number of paragraphs of lorem ipsum [default: 5]
     --fake-name              Use fake names (instead of test-user)
     --gpt3=type              Use GPT-3 generated data ('story' or 'argument')
+    --verbose                Print parsed arguments and generated text
 
 Overview:
     Stream fake keystroke data to a server, emulating Google Docs
@@ -30,16 +32,25 @@ Overview:
 import aiohttp
 import asyncio
 import docopt
-import json
-import names
+import functools
 import random
 import sys
 import time
 
-from learning_observer.lorem import get_paragraphs
+# We encode one event per character per stream, so the JSON encoder is
+# our hot path. `orjson` is much faster, but optional. The server only
+# accepts text frames, so we always hand back a `str`.
+try:
+    import orjson
+
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode('utf-8')
+except ImportError:
+    from json import dumps as json_dumps
 
 ARGS = docopt.docopt(__doc__)
-print(ARGS)
+if ARGS['--verbose']:
+    print(ARGS)
 
 STREAMS = int(ARGS["--streams"])
 
@@ -94,21 +105,33 @@ def argument_list(argument, default):
         sys.exit(-1)
     return list_string
 
-# TODO what is `source_files` supposed to be?
-# when running this script for the workshop, we should either
+
+def text_from_file(filename):
+    '''
+    Lazily yield the characters of a source file. We stream at typing
+    speed, so there's no reason to hold every file in memory (or keep
+    file handles open) before we start.
+    '''
+    with open(filename) as fp:
+        for line in fp:
+            yield from line
+
+
+# TODO when running this script for the workshop, we should either
 #  1) move gpt3 texts out of writing observer (dependency hell) OR
 #  2) avoid using `--gpt3` parameter and use local lorem generator instead
-source_files = None
-
 if ARGS["--gpt3"] is not None:
     import writing_observer.sample_essays
     TEXT = writing_observer.sample_essays.GPT3_TEXTS[ARGS["--gpt3"]]
     STREAMS = len(TEXT)
-elif source_files is None:
-    TEXT = ["\n".join(get_paragraphs(int(ARGS.get("--text-length", 5)))) for i in range(STREAMS)]
-    print(TEXT)
+elif ARGS["--source"] is not None:
+    source_files = argument_list('--source', None)
+    TEXT = [text_from_file(filename) for filename in source_files]
 else:
-    TEXT = [open(filename).read() for filename in source_files]
+    from learning_observer.lorem import get_paragraphs
+    TEXT = ["\n".join(get_paragraphs(int(ARGS.get("--text-length", 5)))) for i in range(STREAMS)]
+    if ARGS['--verbose']:
+        print(TEXT)
 
 ICI = argument_list(
     '--ici',
@@ -120,14 +143,10 @@ DOC_IDS = argument_list(
     lambda: [f"fake-google-doc-id-{i}" for i in range(STREAMS)]
 )
 
-source_files = argument_list(
-    '--source',
-    None
-)
-
 if ARGS['--users'] is not None:
     USERS = argument_list('--users', None)
 elif ARGS['--fake-name']:
+    import names
     USERS = [names.get_first_name() for i in range(STREAMS)]
 else:
     USERS = ["test-user-{n}".format(n=i) for i in range(STREAMS)]
@@ -157,6 +176,7 @@ def insert(index, text, doc_id):
     }
 
 
+@functools.lru_cache(maxsize=None)
 def identify(user):
     '''
     Send a token identifying user.
@@ -164,8 +184,10 @@ def identify(user):
     TBD: How we want to manage this. We're still figuring out auth/auth.
     This might just be scaffolding code for now, or we might do something
     along these lines.
+
+    Returns the messages already serialized, and cached per user.
     '''
-    return [
+    return tuple(json_dumps(command) for command in [
         {
             "event": "test_framework_fake_identity",
             "source": "org.mitros.writing_analytics",
@@ -176,7 +198,7 @@ def identify(user):
             "source": "org.mitros.writing_analytics",
             "origin": "stream_test_script"
         }
-    ]
+    ])
 
 
 async def stream_document(text, ici, user, doc_id):
@@ -190,12 +212,11 @@ async def stream_document(text, ici, user, doc_id):
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.ws_connect(url) as web_socket:
-                    commands = identify(user)
-                    for command in commands:
-                        await web_socket.send_str(json.dumps(command))
-                    for char, index in zip(text, range(len(text))):
+                    for message in identify(user):
+                        await web_socket.send_str(message)
+                    for index, char in enumerate(text):
                         command = insert(index + 1, char, doc_id)
-                        await web_socket.send_str(json.dumps(command))
+                        await web_socket.send_str(json_dumps(command))
                         # We probably want something that doesn't go as big and which isn't as close to zero as often. Perhaps weibull with k=1.5?
                         await asyncio.sleep(random.expovariate(lambd=1/float(ici)))
             done = True